@@ -20,6 +20,26 @@ from script_executor import read_ips_from_csv, ScriptExecutor
 # Initialize logger for this module
 logger = get_module_logger(__name__)
 
+# Placeholder OME inventory script written when the real one is missing
+_PLACEHOLDER_SCRIPT = """#!/usr/bin/env python3
+import sys
+import time
+import argparse
+
+def run(ip):
+    print(f"Processing IP: {ip}")
+    # Simulate some work
+    time.sleep(2)
+    print(f"Completed processing for {ip}")
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--ip', required=True, help='IP address to process')
+    args = parser.parse_args()
+    sys.exit(run(args.ip))
+"""
+
 def perform_graphql_query():
     """
     Simulate performing a GraphQL query and generating CSV output.
@@ -44,14 +64,16 @@ def perform_graphql_query():
     import csv
     with open(csv_path, 'w', newline='', encoding='utf-8') as csvfile:
         writer = csv.writer(csvfile)
-        writer.writerow(['Id', 'ServerName', 'Serial', 'AppId', 'AppName', 'TimestampEpoch', 'IP', 'ServerCount', 'SystemType'])
-        writer.writerow(['1', 'server1', 'SER123', '1001', 'App-1001', '1616679168', '192.168.1.10', '15', 'Dell OME'])
-        writer.writerow(['2', 'server2', 'SER124', '1002', 'App-1002', '1616679169', '192.168.1.11', '22', 'Dell OME'])
-        writer.writerow(['3', 'server3', 'SER125', '1003', 'App-1003', '1616679170', '192.168.1.12', '0', 'HP OV'])
-        writer.writerow(['4', 'server4', 'SER126', '1004', 'App-1004', '1616679171', '192.168.1.13', '18', 'Dell OME'])
-        writer.writerow(['5', 'server5', 'SER127', '1005', 'App-1005', '1616679172', '192.168.1.14', '0', ''])
-    
-    logger.info(f"Created CSV output at {csv_path}")
+        writer.writerows([
+            ['Id', 'ServerName', 'Serial', 'AppId', 'AppName', 'TimestampEpoch', 'IP', 'ServerCount', 'SystemType'],
+            ['1', 'server1', 'SER123', '1001', 'App-1001', '1616679168', '192.168.1.10', '15', 'Dell OME'],
+            ['2', 'server2', 'SER124', '1002', 'App-1002', '1616679169', '192.168.1.11', '22', 'Dell OME'],
+            ['3', 'server3', 'SER125', '1003', 'App-1003', '1616679170', '192.168.1.12', '0', 'HP OV'],
+            ['4', 'server4', 'SER126', '1004', 'App-1004', '1616679171', '192.168.1.13', '18', 'Dell OME'],
+            ['5', 'server5', 'SER127', '1005', 'App-1005', '1616679172', '192.168.1.14', '0', '']
+        ])
+    
+    logger.info("Created CSV output at %s", csv_path)
     return csv_path
 
 def main():
@@ -64,7 +86,7 @@ def main():
     debug_mode = get_config_bool("application", "debug_mode", False)
     max_threads = get_config_int("application", "max_threads", 4)
     
-    logger.info(f"Application configured with debug_mode={debug_mode}, max_threads={max_threads}")
+    logger.info("Application configured with debug_mode=%s, max_threads=%d", debug_mode, max_threads)
     
     # Perform GraphQL query and generate CSV
     csv_path = perform_graphql_query()
@@ -76,11 +98,11 @@ def main():
         logger.error("No valid IP addresses found in CSV")
         return
     
-    logger.info(f"Found {len(ip_data)} IP addresses with positive server counts")
+    logger.info("Found %d IP addresses with positive server counts", len(ip_data))
     
     # Execute OME inventory scripts in parallel
     concurrent_scripts = get_config_int("application", "concurrent_ome_scripts", 10)
-    logger.info(f"Will execute up to {concurrent_scripts} scripts concurrently")
+    logger.info("Will execute up to %d scripts concurrently", concurrent_scripts)
     
     # Extract just the IPs
     ip_list = [entry['IP'] for entry in ip_data]
@@ -90,23 +112,9 @@ def main():
     
     # Check if script path exists
     if not os.path.exists(script_path):
-        logger.warning(f"Script {script_path} not found - creating a placeholder for demo")
+        logger.warning("Script %s not found - creating a placeholder for demo", script_path)
         
         # Create a simple placeholder script
         with open(script_path, 'w') as f:
-            f.write("""#!/usr/bin/env python3
-import sys
-import time
-import argparse
-
-parser = argparse.ArgumentParser()
-parser.add_argument('--ip', required=True, help='IP address to process')
-args = parser.parse_args()
-
-print(f"Processing IP: {args.ip}")
-# Simulate some work
-time.sleep(2)
-print(f"Completed processing for {args.ip}")
-sys.exit(0)
-""")
+            f.write(_PLACEHOLDER_SCRIPT)
         os.chmod(script_path,
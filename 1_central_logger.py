@@ -11,15 +11,31 @@ Features:
 
 import os
 import sys
+import queue
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
-from datetime import datetime
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+import time
 from pathlib import Path
 from typing import Optional
 
 # Import the config parser utility
 from config_parser_util import get_config_value, get_config_int, get_config_bool
 
+# Path and name of the main script, resolved once at import time
+_SCRIPT_ABS = os.path.abspath(sys.argv[0])
+_SCRIPT_DIR = os.path.dirname(_SCRIPT_ABS)
+_SCRIPT_NAME = os.path.splitext(os.path.basename(_SCRIPT_ABS))[0]
+
+# Queue listeners doing the actual log I/O, keyed by logger name
+_LISTENERS: dict = {}
+
+# Rotating file handler of each logger name, reused across setup_logger calls
+_HANDLER_CACHE: dict = {}
+
+# Shared formatter for all handlers
+_FORMATTER = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
 def get_script_name() -> str:
     """
     Get the name of the calling script without extension.
@@ -27,8 +43,7 @@ def get_script_name() -> str:
     Returns:
         Script name without extension
     """
-    main_script = sys.argv[0]
-    return os.path.splitext(os.path.basename(main_script))[0]
+    return _SCRIPT_NAME
 
 def setup_logger(
     logger_name: Optional[str] = None,
@@ -64,47 +79,75 @@ def setup_logger(
     level = getattr(logging, level_str.upper(), logging.INFO)
     logger.setLevel(level)
     
-    # Clear existing handlers
+    # Clear existing handlers and stop a previous listener for this logger
     logger.handlers = []
+    previous_listener = _LISTENERS.pop(logger_name, None)
+    if previous_listener is not None:
+        atexit.unregister(previous_listener.stop)
+        previous_listener.stop()
     
     # Create log directory if it doesn't exist
-    log_dir = os.path.abspath(os.path.join(
-        os.path.dirname(os.path.abspath(sys.argv[0])),
-        config_log_dir
-    ))
+    log_dir = os.path.abspath(os.path.join(_SCRIPT_DIR, config_log_dir))
     os.makedirs(log_dir, exist_ok=True)
     
-    # Create log file path with timestamp
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    log_file = os.path.join(log_dir, f"{logger_name}_{timestamp}.log")
-    
-    # Set up file handler with rotation
+    # Reuse this logger's file handler, keeping its log file, unless the settings changed;
+    # a replaced handler is closed, its listener has already been stopped above
     max_bytes = config_max_size * 1024 * 1024  # Convert MB to bytes
-    file_handler = RotatingFileHandler(
-        log_file,
-        maxBytes=max_bytes,
-        backupCount=5,
-        encoding='utf-8'
-    )
-    
-    # Set formatter
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+    file_handler = _HANDLER_CACHE.get(logger_name)
+    if file_handler is not None and (
+        file_handler.maxBytes != max_bytes or os.path.dirname(file_handler.baseFilename) != log_dir
+    ):
+        file_handler.close()
+        file_handler = None
+    
+    if file_handler is None:
+        # Create log file path with timestamp
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        log_file = os.path.join(log_dir, f"{logger_name}_{timestamp}.log")
+        
+        # Set up file handler with rotation
+        file_handler = RotatingFileHandler(
+            log_file,
+            maxBytes=max_bytes,
+            backupCount=5,
+            encoding='utf-8'
+        )
+        file_handler.setFormatter(_FORMATTER)
+        _HANDLER_CACHE[logger_name] = file_handler
+    log_file = file_handler.baseFilename
+    handlers = [file_handler]
     
     # Add console output if enabled
     use_console = console_output if console_output is not None else config_console
     if use_console:
         console_handler = logging.StreamHandler()
-        console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
-    
-    logger.info(f"Logger initialized with level {level_str}, log file: {log_file}")
+        console_handler.setFormatter(_FORMATTER)
+        handlers.append(console_handler)
+    
+    # Callers only enqueue records, a background listener does the formatting and I/O
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(QueueHandler(log_queue))
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    _LISTENERS[logger_name] = listener
+    
+    # Module loggers share _ROOT_HANDLERS, point it at the root logger's new QueueHandler
+    if logger is _root_logger:
+        _ROOT_HANDLERS[:] = logger.handlers
+    
+    logger.info("Logger initialized with level %s, log file: %s", level_str, log_file)
     return logger
 
 # Global root logger for centralized logging
 _root_logger = None
 
+# Handlers of the root logger, shared by reference with every module logger
+_ROOT_HANDLERS: list = []
+
+# Module loggers that have already been configured
+_MODULE_LOGGERS: dict = {}
+
 def get_root_logger():
     """
     Get the root logger that's shared across all modules.
@@ -116,6 +159,7 @@ def get_root_logger():
     global _root_logger
     if _root_logger is None:
         _root_logger = setup_logger(logger_name=get_script_name())
+        _ROOT_HANDLERS[:] = _root_logger.handlers
     return _root_logger
 
 def get_module_logger(module_name: str):
@@ -128,23 +172,24 @@ def get_module_logger(module_name: str):
     Returns:
         Module-specific logger
     """
+    # Return already configured loggers directly
+    if module_name in _MODULE_LOGGERS:
+        return _MODULE_LOGGERS[module_name]
+    
     # Ensure root logger is initialized
     root_logger = get_root_logger()
     
-    # Create a module logger
+    # Create a module logger with the root logger's level and handlers
     logger = logging.getLogger(module_name)
-    
-    # Use the same level as the root logger
     logger.setLevel(root_logger.level)
     
     # Don't propagate to avoid duplicate logs
     logger.propagate = False
     
-    # Use the same handlers as the root logger
-    if not logger.handlers:
-        for handler in root_logger.handlers:
-            logger.addHandler(handler)
+    # Share the handler list so module loggers follow the root logger
+    logger.handlers = _ROOT_HANDLERS
     
+    _MODULE_LOGGERS[module_name] = logger
     return logger
 
 if __name__ == "__main__":
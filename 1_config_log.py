@@ -6,9 +6,20 @@ Utility for reading configuration from config.cfg file using ConfigParser.
 import os
 import sys
 import configparser
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Optional, Dict
 
+# Location of the config file, resolved once from the main script's directory
+_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(sys.argv[0])), "config", "config.cfg")
+
+# Cached configuration, parsed once and reused until the file changes on disk
+_CONFIG: Optional[configparser.ConfigParser] = None
+_CONFIG_MTIME: Optional[float] = None
+
+# String values treated as True by get_config_bool
+_TRUE_TOKENS = frozenset(('true', 'yes', '1', 'on', 't', 'y'))
+
 def get_config_path() -> str:
     """
     Get the path to the configuration file.
@@ -16,9 +27,7 @@ def get_config_path() -> str:
     Returns:
         Absolute path to the config file
     """
-    script_dir = os.path.dirname(os.path.abspath(sys.argv[0]))
-    config_dir = os.path.join(script_dir, "config")
-    return os.path.join(config_dir, "config.cfg")
+    return _CONFIG_PATH
 
 def create_default_config(config_path: str) -> configparser.ConfigParser:
     """
@@ -76,25 +85,58 @@ def load_config() -> configparser.ConfigParser:
     """
     Load the application configuration from config.cfg.
     Creates a default configuration if it doesn't exist.
+    The parsed configuration is cached and only re-read when the
+    file's modification time changes.
     
     Returns:
         ConfigParser object with application settings
     """
+    global _CONFIG, _CONFIG_MTIME
     config_path = get_config_path()
-    config = configparser.ConfigParser()
     
-    # Check if config file exists
-    if not os.path.exists(config_path):
-        print(f"Config file not found at {config_path}. Creating default config.")
-        return create_default_config(config_path)
-    
-    # Load existing config
     try:
-        config.read(config_path)
+        # Reuse the cached config if the file hasn't changed
+        mtime = os.path.getmtime(config_path)
+        if _CONFIG is not None and mtime == _CONFIG_MTIME:
+            return _CONFIG
+        
+        # Load existing config, read() silently skips missing files
+        config = configparser.ConfigParser()
+        _clear_lookup_caches()
+        if not config.read(config_path):
+            raise FileNotFoundError(config_path)
+        _CONFIG = config
+        _CONFIG_MTIME = mtime
         return config
-    except Exception as e:
+    except FileNotFoundError:
+        print(f"Config file not found at {config_path}. Creating default config.")
+    except (configparser.Error, OSError) as e:
         print(f"Error loading config file: {str(e)}. Creating default config.")
-        return create_default_config(config_path)
+    
+    _clear_lookup_caches()
+    _CONFIG = create_default_config(config_path)
+    _CONFIG_MTIME = os.path.getmtime(config_path)
+    return _CONFIG
+
+@lru_cache(maxsize=256)
+def _lookup_config_value(section: str, key: str) -> Optional[str]:
+    """
+    Look up a raw value in the configuration, cached per (section, key).
+    The cache is cleared whenever load_config re-reads the file, which
+    the getters check before every lookup.
+    
+    Args:
+        section: Section name in the config
+        key: Key within the section
+        
+    Returns:
+        Value from config, or None if not found
+    """
+    config = load_config()
+    try:
+        return config[section][key]
+    except (KeyError, ValueError):
+        return None
 
 def get_config_value(section: str, key: str, default: Any = None) -> Any:
     """
@@ -108,11 +150,31 @@ def get_config_value(section: str, key: str, default: Any = None) -> Any:
     Returns:
         Value from config, or default if not found
     """
-    config = load_config()
+    # Re-read the file if it changed, which also clears the cached lookups
+    load_config()
+    value = _lookup_config_value(section, key)
+    return default if value is None else value
+
+@lru_cache(maxsize=128)
+def _parse_config_number(section: str, key: str, cast: type) -> Optional[Any]:
+    """
+    Convert a configuration value to a number, cached per (section, key, cast).
+    The cache is cleared whenever load_config re-reads the file, which
+    the getters check before every lookup.
+    
+    Args:
+        section: Section name in the config
+        key: Key within the section
+        cast: Numeric type to convert to (int or float)
+        
+    Returns:
+        Converted value, or None if not found or not convertible
+    """
+    value = get_config_value(section, key)
     try:
-        return config[section][key]
-    except (KeyError, ValueError):
-        return default
+        return cast(value)
+    except (TypeError, ValueError):
+        return None
 
 def get_config_int(section: str, key: str, default: int = 0) -> int:
     """
@@ -126,11 +188,10 @@ def get_config_int(section: str, key: str, default: int = 0) -> int:
     Returns:
         Integer value from config, or default if not found or not an integer
     """
-    value = get_config_value(section, key)
-    try:
-        return int(value)
-    except (TypeError, ValueError):
-        return default
+    # Re-read the file if it changed, which also clears the cached lookups
+    load_config()
+    value = _parse_config_number(section, key, int)
+    return default if value is None else value
 
 def get_config_float(section: str, key: str, default: float = 0.0) -> float:
     """
@@ -144,11 +205,10 @@ def get_config_float(section: str, key: str, default: float = 0.0) -> float:
     Returns:
         Float value from config, or default if not found or not a float
     """
-    value = get_config_value(section, key)
-    try:
-        return float(value)
-    except (TypeError, ValueError):
-        return default
+    # Re-read the file if it changed, which also clears the cached lookups
+    load_config()
+    value = _parse_config_number(section, key, float)
+    return default if value is None else value
 
 def get_config_bool(section: str, key: str, default: bool = False) -> bool:
     """
@@ -166,14 +226,18 @@ def get_config_bool(section: str, key: str, default: bool = False) -> bool:
     if value is None:
         return default
     
-    if isinstance(value, bool):
-        return value
-    
     if isinstance(value, str):
-        return value.lower() in ('true', 'yes', '1', 'on', 't', 'y')
+        return value.lower() in _TRUE_TOKENS
     
     return bool(value)
 
+def _clear_lookup_caches() -> None:
+    """
+    Drop cached lookups after the configuration has been (re)loaded.
+    """
+    _lookup_config_value.cache_clear()
+    _parse_config_number.cache_clear()
+
 def update_config_value(section: str, key: str, value: Any) -> bool:
     """
     Update a specific value in the configuration.
@@ -186,6 +250,7 @@ def update_config_value(section: str, key: str, value: Any) -> bool:
     Returns:
         True if successful, False otherwise
     """
+    global _CONFIG, _CONFIG_MTIME
     config_path = get_config_path()
     config = load_config()
     
@@ -200,9 +265,13 @@ def update_config_value(section: str, key: str, value: Any) -> bool:
     try:
         with open(config_path, 'w') as configfile:
             config.write(configfile)
+        _CONFIG = config
+        _CONFIG_MTIME = os.path.getmtime(config_path)
+        _clear_lookup_caches()
         return True
     except Exception as e:
         print(f"Error updating config: {str(e)}")
+        _CONFIG = None
         return False
 
 if __name__ == "__main__":
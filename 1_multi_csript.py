@@ -1,20 +1,18 @@
 #!/usr/bin/env python3
 """
-Multi-threaded script executor for launching OME inventory scripts.
+Asynchronous script executor for launching OME inventory scripts.
 Reads IP addresses from CSV output and launches get_ome_inventory.py scripts
 in parallel with controlled concurrency.
 """
 
 import os
 import sys
-import csv
 import time
-import subprocess
-import threading
-import queue
+import asyncio
+import importlib.util
 from typing import List, Dict, Any, Optional
+import pandas as pd
 import logging
-from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Import our utilities
@@ -24,23 +22,95 @@ from universal_logger_configparser import get_module_logger
 # Initialize logger
 logger = get_module_logger(__name__)
 
+def get_available_cpus() -> int:
+    """
+    Get the number of CPUs this process may run on.
+    
+    Returns:
+        CPU count honouring affinity/cgroup limits where the platform supports it
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
 class ScriptExecutor:
     """
     Class to manage execution of multiple scripts in parallel.
     """
-    def __init__(self, max_concurrent: int = 10):
+    def __init__(self, max_concurrent: Optional[int] = None, in_process: bool = False):
         """
         Initialize the script executor.
         
         Args:
-            max_concurrent: Maximum number of concurrent scripts
+            max_concurrent: Maximum number of concurrent scripts. Defaults to
+                four per available CPU (capped at 32) since the scripts are I/O-bound
+            in_process: Call the script's run(ip) function in-process when it
+                exposes one, instead of launching a new interpreter per IP.
+                Importing runs the script's top level in this process, and its
+                output is not discarded, so only enable it for scripts written for it
         """
+        if max_concurrent is None:
+            max_concurrent = min(32, 4 * get_available_cpus())
         self.max_concurrent = max_concurrent
-        self.active_processes = {}  # Keep track of running processes
-        self.lock = threading.Lock()  # Lock for thread-safe operations
-        self.completed_count = 0
+        self.in_process = in_process
+        self._modules = {}  # Imported script modules by path, None if not importable
+        self.active_count = 0  # Scripts currently holding a concurrency slot
+    
+    def _load_script_module(self, script_path: str) -> Optional[Any]:
+        """
+        Import a script once so its run(ip) function can be called directly.
+        
+        Args:
+            script_path: Path to the script to import
+            
+        Returns:
+            Imported module, or None if it can't be imported or has no run function
+        """
+        if script_path in self._modules:
+            return self._modules[script_path]
+        
+        module = None
+        try:
+            module_name = os.path.splitext(os.path.basename(script_path))[0]
+            spec = importlib.util.spec_from_file_location(module_name, script_path)
+            if spec is not None and spec.loader is not None:
+                module = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(module)
+                if not callable(getattr(module, 'run', None)):
+                    module = None
+        except (Exception, SystemExit) as e:
+            logger.warning("Script %s can't be imported, falling back to subprocess: %s", script_path, e)
+            module = None
+        
+        self._modules[script_path] = module
+        return module
+    
+    async def _execute_in_process(self, module: Any, ip_address: str) -> None:
+        """
+        Run an imported script's run(ip) function in a worker thread.
+        
+        Args:
+            module: Imported script module exposing run(ip)
+            ip_address: IP address to pass to the script
+        """
+        logger.info("Running script in-process for IP %s", ip_address)
+        
+        start_time = time.monotonic()
+        try:
+            returncode = await asyncio.to_thread(module.run, ip_address)
+        except SystemExit as e:
+            # sys.exit() in the script ends this IP only, like a subprocess exit status
+            returncode = e.code if e.code is None or isinstance(e.code, int) else 1
+            if returncode == 1 and e.code != 1:
+                logger.error(f"Error output: {e.code}")
+        duration = time.monotonic() - start_time
+        
+        if not returncode:
+            logger.info("Script for IP %s completed successfully in %.2f seconds", ip_address, duration)
+        else:
+            logger.error(f"Script for IP {ip_address} failed with return code {returncode}")
         
-    def execute_script(self, ip_address: str, script_path: str = "get_ome_inventory.py") -> None:
+    async def execute_script(self, ip_address: str, script_path: str = "get_ome_inventory.py") -> None:
         """
         Execute an OME inventory script for a specific IP address.
         
@@ -49,61 +119,59 @@ class ScriptExecutor:
             script_path: Path to the script to execute
         """
         try:
+            if self.in_process:
+                module = self._load_script_module(script_path)
+                if module is not None:
+                    await self._execute_in_process(module, ip_address)
+                    return
+            
             # Prepare command
             cmd = [sys.executable, script_path, "--ip", ip_address]
             
-            logger.info(f"Launching script for IP {ip_address}: {' '.join(cmd)}")
+            logger.info("Launching script for IP %s", ip_address)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Command for IP %s: %s", ip_address, ' '.join(cmd))
             
             # Start the process
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                bufsize=1
+            start_time = time.monotonic()
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE
             )
             
-            # Keep track of this process
-            process_id = id(process)
-            with self.lock:
-                self.active_processes[process_id] = {
-                    'process': process,
-                    'ip': ip_address,
-                    'start_time': time.time()
-                }
-            
-            # Wait for process to complete
-            stdout, stderr = process.communicate()
-            
-            # Process completed
-            with self.lock:
-                if process_id in self.active_processes:
-                    end_time = time.time()
-                    duration = end_time - self.active_processes[process_id]['start_time']
-                    del self.active_processes[process_id]
-                    self.completed_count += 1
+            # Wait for process to complete without blocking the event loop,
+            # only stderr is kept for error reporting
+            _, stderr = await process.communicate()
+            duration = time.monotonic() - start_time
             
             # Log results
             if process.returncode == 0:
-                logger.info(f"Script for IP {ip_address} completed successfully in {duration:.2f} seconds")
+                logger.info("Script for IP %s completed successfully in %.2f seconds", ip_address, duration)
             else:
                 logger.error(f"Script for IP {ip_address} failed with return code {process.returncode}")
-                logger.error(f"Error output: {stderr}")
+                logger.error(f"Error output: {stderr.decode(errors='replace')}")
             
         except Exception as e:
             logger.error(f"Error executing script for IP {ip_address}: {str(e)}")
     
-    def get_active_count(self) -> int:
+    async def _run_limited(self, semaphore: asyncio.Semaphore, ip_address: str, script_path: str) -> None:
         """
-        Get the number of currently running processes.
+        Execute a script once a concurrency slot is available.
         
-        Returns:
-            Number of active processes
+        Args:
+            semaphore: Semaphore limiting the number of running scripts
+            ip_address: IP address to pass to the script
+            script_path: Path to the script to execute
         """
-        with self.lock:
-            return len(self.active_processes)
+        async with semaphore:
+            self.active_count += 1
+            try:
+                await self.execute_script(ip_address, script_path)
+            finally:
+                self.active_count -= 1
     
-    def execute_batch(self, ip_addresses: List[str], script_path: str = "get_ome_inventory.py") -> None:
+    async def execute_batch(self, ip_addresses: List[str], script_path: str = "get_ome_inventory.py") -> None:
         """
         Execute scripts for multiple IP addresses with controlled concurrency.
         
@@ -111,49 +179,26 @@ class ScriptExecutor:
             ip_addresses: List of IP addresses to process
             script_path: Path to the script to execute
         """
-        logger.info(f"Starting batch execution for {len(ip_addresses)} IP addresses with max concurrency {self.max_concurrent}")
+        logger.info("Starting batch execution for %d IP addresses with max concurrency %d", len(ip_addresses), self.max_concurrent)
         
-        # Create a queue of IP addresses
-        ip_queue = queue.Queue()
-        for ip in ip_addresses:
-            ip_queue.put(ip)
+        total_ips = len(ip_addresses)
+        completed = 0
         
-        total_ips = ip_queue.qsize()
+        # A single event loop supervises all subprocesses, the semaphore caps concurrency
+        semaphore = asyncio.Semaphore(self.max_concurrent)
+        tasks = [
+            asyncio.create_task(self._run_limited(semaphore, ip, script_path))
+            for ip in ip_addresses
+        ]
         
-        # Process IPs until queue is empty
-        while not ip_queue.empty():
-            # Check current active processes
-            active_count = self.get_active_count()
-            
-            # Calculate how many new processes we can start
-            slots_available = self.max_concurrent - active_count
-            
-            if slots_available > 0:
-                # Start new processes up to the available slots
-                for _ in range(min(slots_available, ip_queue.qsize())):
-                    if ip_queue.empty():
-                        break
-                    
-                    ip = ip_queue.get()
-                    thread = threading.Thread(target=self.execute_script, args=(ip, script_path))
-                    thread.daemon = True
-                    thread.start()
-            
-            # Log progress
-            completed = self.completed_count
-            remaining = ip_queue.qsize()
-            in_progress = active_count
-            logger.info(f"Progress: {completed}/{total_ips} completed, {in_progress} in progress, {remaining} remaining")
-            
-            # Wait a bit before checking again
-            time.sleep(5)
-        
-        # Wait for all processes to complete
-        while self.get_active_count() > 0:
-            logger.info(f"Waiting for {self.get_active_count()} processes to complete...")
-            time.sleep(5)
+        for task in asyncio.as_completed(tasks):
+            await task
+            completed += 1
+            in_progress = self.active_count
+            remaining = total_ips - completed - in_progress
+            logger.info("Progress: %d/%d completed, %d in progress, %d remaining", completed, total_ips, in_progress, remaining)
         
-        logger.info(f"Batch execution completed. Processed {self.completed_count} IP addresses.")
+        logger.info("Batch execution completed. Processed %d IP addresses.", completed)
 
 def read_ips_from_csv(csv_path: str) -> List[Dict[str, Any]]:
     """
@@ -168,42 +213,41 @@ def read_ips_from_csv(csv_path: str) -> List[Dict[str, Any]]:
     results = []
     
     try:
-        with open(csv_path, 'r', newline='', encoding='utf-8') as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                # Check if row has IP and ServerCount fields
-                if 'IP' in row and 'ServerCount' in row:
-                    # Only include rows with valid IPs and positive server counts
-                    ip = row['IP'].strip()
-                    
-                    # Try to parse ServerCount
-                    try:
-                        server_count = int(row['ServerCount']) if row['ServerCount'] else 0
-                    except (ValueError, TypeError):
-                        server_count = 0
-                    
-                    # Add to results if valid
-                    if ip and ip != '-' and server_count > 0:
-                        results.append({
-                            'IP': ip,
-                            'ServerCount': server_count
-                        })
+        df = pd.read_csv(
+            csv_path,
+            usecols=lambda column: column in ('IP', 'ServerCount'),
+            dtype=str,
+            encoding='utf-8'
+        )
+        
+        # Check if CSV has IP and ServerCount columns
+        if {'IP', 'ServerCount'}.issubset(df.columns):
+            ips = df['IP'].str.strip()
+            server_counts = pd.to_numeric(df['ServerCount'], errors='coerce').fillna(0).astype(int)
+            
+            # Only include rows with valid IPs and positive server counts
+            mask = ips.notna() & (ips != '') & (ips != '-') & (server_counts > 0)
+            results = pd.DataFrame({
+                'IP': ips[mask],
+                'ServerCount': server_counts[mask]
+            }).to_dict('records')
     except Exception as e:
         logger.error(f"Error reading CSV file {csv_path}: {str(e)}")
     
-    logger.info(f"Found {len(results)} valid IP addresses with positive server counts")
+    logger.info("Found %d valid IP addresses with positive server counts", len(results))
     return results
 
-def main(csv_path: str, script_path: str = "get_ome_inventory.py"):
+def main(csv_path: str, script_path: str = "get_ome_inventory.py", in_process: bool = False):
     """
     Main function to process CSV and execute OME inventory scripts.
     
     Args:
         csv_path: Path to the CSV file with IP addresses
         script_path: Path to the script to execute
+        in_process: Call the script's run(ip) function instead of launching subprocesses
     """
-    # Read max concurrent scripts from config
-    max_concurrent = get_config_int("application", "concurrent_ome_scripts", 10)
+    # Read max concurrent scripts from config, falling back to a CPU-based default
+    max_concurrent = get_config_int("application", "concurrent_ome_scripts", None)
     
     # Read IPs from CSV
     ip_data = read_ips_from_csv(csv_path)
@@ -216,8 +260,8 @@ def main(csv_path: str, script_path: str = "get_ome_inventory.py"):
     ip_list = [entry['IP'] for entry in ip_data]
     
     # Create executor and run batch
-    executor = ScriptExecutor(max_concurrent=max_concurrent)
-    executor.execute_batch(ip_list, script_path)
+    executor = ScriptExecutor(max_concurrent=max_concurrent, in_process=in_process)
+    asyncio.run(executor.execute_batch(ip_list, script_path))
 
 if __name__ == "__main__":
     import argparse
@@ -225,6 +269,7 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Execute OME inventory scripts for IP addresses in a CSV file')
     parser.add_argument('csv_file', help='Path to the CSV file with IP addresses')
     parser.add_argument('--script', default='get_ome_inventory.py', help='Path to the script to execute (default: get_ome_inventory.py)')
+    parser.add_argument('--in-process', action='store_true', help="Call the script's run(ip) function in this process instead of launching one interpreter per IP")
     
     args = parser.parse_args()
     
@@ -232,4 +277,4 @@ if __name__ == "__main__":
         print(f"Error: CSV file {args.csv_file} not found")
         sys.exit(1)
     
-    main(args.csv_file, args.script)
+    main(args.csv_file, args.script, args.in_process)
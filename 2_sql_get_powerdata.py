@@ -9,13 +9,20 @@ Requirements:
 - Python 3.12
 - pyodbc
 - pandas
+- pyarrow (optional, for --format parquet)
 """
 
 import os
+import json
+import time
+import hashlib
 import sys
 import argparse
 import configparser
 import logging
+import threading
+import warnings
+import numpy as np
 import pandas as pd
 import pyodbc
 import concurrent.futures
@@ -23,15 +30,57 @@ from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Tuple, Optional, Any
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import turbodbc
+    from turbodbc import make_options, Megabytes
+except ImportError:
+    turbodbc = None
+
+# Parse CSV files with the multithreaded pyarrow reader when it is installed
+try:
+    import pyarrow
+    CSV_ENGINE = "pyarrow"
+except ImportError:
+    CSV_ENGINE = "c"
+
+# Maximum number of serial numbers sent in a single IN (...) list
+BATCH_SIZE = 1000
+
+# Number of rows pulled from the driver per fetch call
+FETCH_SIZE = 1000
+
+# Per-thread database connection, opened on a worker's first serial number
+_THREAD_STATE = threading.local()
+
+# Every connection opened by a worker thread, so they can be closed afterwards
+_THREAD_CONNECTIONS: List[Any] = []
+_THREAD_CONNECTIONS_LOCK = threading.Lock()
+
+# Configuration and (OV, OME) queries rebuilt inside each worker process by _init_worker
+_WORKER_CONFIG: Optional[configparser.ConfigParser] = None
+_WORKER_QUERIES: Tuple[str, str] = ("", "")
+
+# Log file of this run, passed on to worker processes so they log to the same file
+LOG_FILE: Optional[Path] = None
+
 # Set up logging
-def setup_logger():
-    """Configure logging"""
-    log_dir = Path("logs")
-    log_dir.mkdir(exist_ok=True)
+def setup_logger(log_file: Optional[Path] = None):
+    """Configure logging, to a new timestamped log file unless log_file is given"""
+    global LOG_FILE
     
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    script_name = Path(__file__).stem
-    log_file = log_dir / f"{script_name}_{timestamp}.log"
+    if log_file is None:
+        log_dir = Path("logs")
+        log_dir.mkdir(exist_ok=True)
+        
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        script_name = Path(__file__).stem
+        log_file = log_dir / f"{script_name}_{timestamp}.log"
+    LOG_FILE = log_file
     
     logging.basicConfig(
         level=logging.INFO,
@@ -76,17 +125,26 @@ def create_default_config(config_path: str):
         "database": "MyDatabase",
         "username": "sa",
         "password": "password",
-        "driver": "ODBC Driver 17 for SQL Server"
+        "driver": "ODBC Driver 17 for SQL Server",
+        "backend": "pyodbc"
     }
     
     config["processing"] = {
         "max_workers": "8",
+        "worker_pool": "thread",
         "timeout_seconds": "60"
     }
     
+    config["cache"] = {
+        "directory": "cache",
+        "ttl_seconds": "3600"
+    }
+    
     config["queries"] = {
         "ov_query": "SELECT [DeviceName],[Model],[AveragePower],[PeakPower24h] FROM [STAGING].[OV].[ServerPower] WHERE SerialNumber LIKE (?)",
-        "ome_query": "SELECT [DeviceSerialNumber],[Model],[AvgPower],[peakPower] FROM [STAGING].[OME].[ServerPower] WHERE DeviceSerialNumber LIKE (?) ORDER BY Timestamp DESC"
+        "ome_query": "SELECT [DeviceSerialNumber],[Model],[AvgPower],[peakPower] FROM [STAGING].[OME].[ServerPower] WHERE DeviceSerialNumber LIKE (?) ORDER BY Timestamp DESC",
+        "ov_batch_query": "SELECT [SerialNumber],[DeviceName],[Model],[AveragePower],[PeakPower24h] FROM [STAGING].[OV].[ServerPower] WHERE SerialNumber IN ({placeholders})",
+        "ome_batch_query": "SELECT [SerialNumber],[DeviceSerialNumber],[Model],[AvgPower],[peakPower] FROM (SELECT [DeviceSerialNumber] AS [SerialNumber],[DeviceSerialNumber],[Model],[AvgPower],[peakPower],ROW_NUMBER() OVER (PARTITION BY DeviceSerialNumber ORDER BY Timestamp DESC) AS rn FROM [STAGING].[OME].[ServerPower] WHERE DeviceSerialNumber IN ({placeholders})) AS latest WHERE rn = 1"
     }
     
     with open(config_path, 'w') as configfile:
@@ -97,6 +155,9 @@ def create_connection(config: configparser.ConfigParser) -> pyodbc.Connection:
     """
     Create a database connection
     
+    Uses pyodbc by default, or turbodbc with asynchronous I/O when the
+    database backend setting is "turbodbc".
+    
     Args:
         config: ConfigParser object with database settings
         
@@ -111,23 +172,74 @@ def create_connection(config: configparser.ConfigParser) -> pyodbc.Connection:
         f"PWD={config['database']['password']};"
     )
     
+    if config.get("database", "backend", fallback="pyodbc") == "turbodbc":
+        if turbodbc is None:
+            raise ImportError("turbodbc backend configured but turbodbc is not installed")
+        options = make_options(read_buffer_size=Megabytes(100), use_async_io=True)
+        return turbodbc.connect(connection_string=conn_str, turbodbc_options=options)
+    
     return pyodbc.connect(conn_str)
 
-def query_ov_power_data(serial_number: str, conn: pyodbc.Connection, query: str) -> Dict[str, Any]:
+def get_thread_connection(config: configparser.ConfigParser):
+    """
+    Return the calling thread's database connection, opening it on first use
+    
+    Args:
+        config: ConfigParser object with database settings
+        
+    Returns:
+        Database connection owned by the current thread
+    """
+    conn = getattr(_THREAD_STATE, "conn", None)
+    if conn is None:
+        conn = create_connection(config)
+        _THREAD_STATE.conn = conn
+        with _THREAD_CONNECTIONS_LOCK:
+            _THREAD_CONNECTIONS.append(conn)
+    return conn
+
+def get_thread_cursor(config: configparser.ConfigParser):
+    """
+    Return the calling thread's cursor, created once on its connection and reused
+    
+    Args:
+        config: ConfigParser object with database settings
+        
+    Returns:
+        Cursor owned by the current thread
+    """
+    cursor = getattr(_THREAD_STATE, "cursor", None)
+    if cursor is None:
+        cursor = get_thread_connection(config).cursor()
+        _THREAD_STATE.cursor = cursor
+    return cursor
+
+def close_thread_connections():
+    """Close all connections opened by worker threads"""
+    with _THREAD_CONNECTIONS_LOCK:
+        connections = _THREAD_CONNECTIONS[:]
+        _THREAD_CONNECTIONS.clear()
+    
+    for conn in connections:
+        try:
+            conn.close()
+        except Exception as e:
+            logger.warning(f"Error closing database connection: {str(e)}")
+
+def query_ov_power_data(serial_number: str, cursor: pyodbc.Cursor, query: str) -> Dict[str, Any]:
     """
     Query OV power data for a specific serial number
     
     Args:
         serial_number: Serial number to query
-        conn: Database connection
+        cursor: Database cursor, reused across serial numbers
         query: SQL query to execute
         
     Returns:
         Dictionary with query results or empty dict if no results
     """
     try:
-        cursor = conn.cursor()
-        cursor.execute(query, serial_number)
+        cursor.execute(query, [serial_number])
         
         columns = [column[0] for column in cursor.description]
         row = cursor.fetchone()
@@ -141,21 +253,20 @@ def query_ov_power_data(serial_number: str, conn: pyodbc.Connection, query: str)
         logger.error(f"Error querying OV data for {serial_number}: {str(e)}")
         return {}
 
-def query_ome_power_data(serial_number: str, conn: pyodbc.Connection, query: str) -> Dict[str, Any]:
+def query_ome_power_data(serial_number: str, cursor: pyodbc.Cursor, query: str) -> Dict[str, Any]:
     """
     Query OME power data for a specific serial number
     
     Args:
         serial_number: Serial number to query
-        conn: Database connection
+        cursor: Database cursor, reused across serial numbers
         query: SQL query to execute
         
     Returns:
         Dictionary with query results or empty dict if no results
     """
     try:
-        cursor = conn.cursor()
-        cursor.execute(query, serial_number)
+        cursor.execute(query, [serial_number])
         
         columns = [column[0] for column in cursor.description]
         row = cursor.fetchone()  # Get only the first (most recent) row
@@ -169,34 +280,241 @@ def query_ome_power_data(serial_number: str, conn: pyodbc.Connection, query: str
         logger.error(f"Error querying OME data for {serial_number}: {str(e)}")
         return {}
 
-def process_serial_number(serial_number: str, config: configparser.ConfigParser) -> Dict[str, Any]:
+def _serial_key(serial_number: Any) -> str:
+    """Normalize a serial number for matching database rows to CSV rows"""
+    return str(serial_number).strip().upper()
+
+def read_query_frame(conn: pyodbc.Connection, sql: str, params: List[Any]) -> pd.DataFrame:
+    """
+    Run a query and return its result set as a DataFrame
+    
+    Args:
+        conn: Database connection
+        sql: SQL query to execute
+        params: Query parameters
+        
+    Returns:
+        DataFrame with the query results
+    """
+    # turbodbc returns whole NumPy columns instead of rows
+    if turbodbc is not None and isinstance(conn, turbodbc.connection.Connection):
+        cursor = conn.cursor()
+        cursor.execute(sql, params)
+        return pd.DataFrame(cursor.fetchallnumpy())
+    
+    # pandas warns about plain DBAPI connections, pyodbc works fine for reads
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message="pandas only supports SQLAlchemy", category=UserWarning)
+        chunks = pd.read_sql_query(sql, conn, params=params, chunksize=FETCH_SIZE)
+        return pd.concat(chunks, ignore_index=True)
+
+def query_power_data_batch(serial_numbers: List[Any], conn: pyodbc.Connection, query: str, prefix: str) -> pd.DataFrame:
+    """
+    Query power data for many serial numbers with one IN (...) query per batch
+    
+    The query must contain an {placeholders} marker for the IN list and return
+    a SerialNumber column, which is used to match rows and is not prefixed.
+    
+    Args:
+        serial_numbers: Serial numbers to query
+        conn: Database connection
+        query: SQL query template to execute
+        prefix: Prefix added to the column names (OV or OME)
+        
+    Returns:
+        DataFrame indexed by normalized serial number with the first result row per serial
+    """
+    frames = []
+    
+    for start in range(0, len(serial_numbers), BATCH_SIZE):
+        batch = serial_numbers[start:start + BATCH_SIZE]
+        sql = query.format(placeholders=",".join("?" * len(batch)))
+        
+        try:
+            frames.append(read_query_frame(conn, sql, batch))
+        except Exception as e:
+            logger.error(f"Error querying {prefix} data for {len(batch)} serial numbers: {str(e)}")
+    
+    if not frames:
+        return pd.DataFrame()
+    
+    data = pd.concat(frames, ignore_index=True)
+    data["SerialNumber"] = data["SerialNumber"].map(_serial_key)
+    data = data.drop_duplicates("SerialNumber").set_index("SerialNumber")
+    return data.add_prefix(f"{prefix}_")
+
+def process_serial_numbers_batch(serial_numbers: List[Any], config: configparser.ConfigParser) -> pd.DataFrame:
+    """
+    Process all serial numbers with batched queries against both databases
+    
+    Serial numbers with a fresh cached result are not queried again.
+    
+    Args:
+        serial_numbers: Serial numbers to process
+        config: ConfigParser object with configuration settings
+        
+    Returns:
+        DataFrame with a SerialNumber column and the combined query results
+    """
+    queries = (config["queries"]["ov_batch_query"], config["queries"]["ome_batch_query"])
+    
+    # Missing serial numbers can't match anything, skip them in the IN list
+    cached = {}
+    query_serials = []
+    for sn in serial_numbers:
+        if pd.isna(sn):
+            continue
+        result = read_cached_result(sn, config, queries)
+        if result is not None:
+            del result["SerialNumber"]
+            cached[_serial_key(sn)] = result
+        else:
+            query_serials.append(str(sn))
+    
+    if query_serials:
+        conn = create_connection(config)
+        try:
+            ov_df = query_power_data_batch(query_serials, conn, queries[0], "OV")
+            ome_df = query_power_data_batch(query_serials, conn, queries[1], "OME")
+        finally:
+            conn.close()
+    else:
+        ov_df = ome_df = pd.DataFrame()
+    
+    # Only cache serial numbers that matched something, so failed lookups are retried
+    for sn in query_serials:
+        key = _serial_key(sn)
+        result = {}
+        if key in ov_df.index:
+            result.update(ov_df.loc[key].to_dict())
+        if key in ome_df.index:
+            result.update(ome_df.loc[key].to_dict())
+        if result:
+            write_cached_result(sn, result, config, queries)
+    
+    # Line up the database and cached rows with the serial numbers in CSV order
+    data_df = pd.concat(
+        [ov_df.join(ome_df, how="outer"), pd.DataFrame.from_dict(cached, orient="index")]
+    )
+    keys = pd.Index([_serial_key(sn) for sn in serial_numbers])
+    results_df = pd.concat(
+        [
+            pd.DataFrame({"SerialNumber": serial_numbers}),
+            data_df.reindex(keys).reset_index(drop=True)
+        ],
+        axis=1
+    )
+    
+    logger.info(
+        f"Matched {len(ov_df)} OV and {len(ome_df)} OME records, "
+        f"{len(cached)} cached, for {len(serial_numbers)} serial numbers"
+    )
+    return results_df
+
+def _cache_path(serial_number: Any, config: configparser.ConfigParser, queries: Tuple[str, str]) -> Path:
+    """Return the cache file path for a serial number, specific to the database and queries used"""
+    key = "\0".join([
+        config.get("database", "server", fallback=""),
+        config.get("database", "database", fallback=""),
+        *queries,
+        str(serial_number)
+    ])
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).hexdigest()
+    return Path(config.get("cache", "directory", fallback="cache")) / f"{digest}.json"
+
+def read_cached_result(serial_number: Any, config: configparser.ConfigParser, queries: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+    """
+    Load a previously stored result for a serial number if it is still fresh
+    
+    Args:
+        serial_number: Serial number to look up
+        config: ConfigParser object with cache settings
+        queries: (OV, OME) queries the result was produced with
+        
+    Returns:
+        Cached result dictionary, or None if caching is disabled or there is no fresh entry
+    """
+    ttl = config.getint("cache", "ttl_seconds", fallback=0)
+    if ttl <= 0:
+        return None
+    
+    path = _cache_path(serial_number, config, queries)
+    try:
+        if time.time() - path.stat().st_mtime > ttl:
+            return None
+        data = path.read_bytes()
+        result = orjson.loads(data) if orjson else json.loads(data)
+    except (OSError, ValueError):
+        return None
+    
+    # Keep the original value (and type) so the result joins back onto the CSV
+    result["SerialNumber"] = serial_number
+    return result
+
+def write_cached_result(serial_number: Any, result: Dict[str, Any], config: configparser.ConfigParser, queries: Tuple[str, str]):
+    """
+    Store the result for a serial number in the on-disk cache
+    
+    Args:
+        serial_number: Serial number the result belongs to
+        result: Combined query results
+        config: ConfigParser object with cache settings
+        queries: (OV, OME) queries the result was produced with
+    """
+    if config.getint("cache", "ttl_seconds", fallback=0) <= 0:
+        return
+    
+    # NumPy scalars (turbodbc columns, older pandas rows) would be stored as strings
+    # by default=str, store the plain Python value a fresh query result holds instead
+    result = {key: value.item() if isinstance(value, np.generic) else value for key, value in result.items()}
+    
+    path = _cache_path(serial_number, config, queries)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if orjson:
+            data = orjson.dumps(result, default=str)
+        else:
+            data = json.dumps(result, default=str).encode("utf-8")
+        path.write_bytes(data)
+    except (OSError, TypeError) as e:
+        logger.warning(f"Could not cache result for {serial_number}: {str(e)}")
+
+def process_serial_number(serial_number: str, config: configparser.ConfigParser, ov_query: str, ome_query: str) -> Dict[str, Any]:
     """
     Process a single serial number by querying both databases
     
     Args:
         serial_number: Serial number to process
         config: ConfigParser object with configuration settings
+        ov_query: OV query, resolved once by the caller
+        ome_query: OME query, resolved once by the caller
         
     Returns:
         Dictionary with combined query results
     """
+    # Serve results from a previous run without touching the database
+    cached = read_cached_result(serial_number, config, (ov_query, ome_query))
+    if cached is not None:
+        logger.info(f"Using cached result for serial number: {serial_number}")
+        return cached
+    
     result = {"SerialNumber": serial_number}
     
     try:
-        # Create a database connection
-        conn = create_connection(config)
+        # Reuse this worker's cursor so the driver can reuse the prepared statements
+        cursor = get_thread_cursor(config)
         
         # Query OV power data
-        ov_query = config["queries"]["ov_query"]
-        ov_data = query_ov_power_data(serial_number, conn, ov_query)
+        ov_data = query_ov_power_data(serial_number, cursor, ov_query)
         result.update(ov_data)
         
         # Query OME power data
-        ome_query = config["queries"]["ome_query"]
-        ome_data = query_ome_power_data(serial_number, conn, ome_query)
+        ome_data = query_ome_power_data(serial_number, cursor, ome_query)
         result.update(ome_data)
         
-        conn.close()
+        # Only cache serial numbers that matched something, so failed lookups are retried
+        if ov_data or ome_data:
+            write_cached_result(serial_number, result, config, (ov_query, ome_query))
         
         logger.info(f"Successfully processed serial number: {serial_number}")
         return result
@@ -205,39 +523,69 @@ def process_serial_number(serial_number: str, config: configparser.ConfigParser)
         logger.error(f"Error processing serial number {serial_number}: {str(e)}")
         return result
 
-def process_csv_file(csv_path: str, config: configparser.ConfigParser) -> bool:
+def _init_worker(config_dict: Dict[str, Dict[str, str]], log_file: Optional[Path]):
     """
-    Process a CSV file by querying databases for each serial number
+    Set up a worker process: rebuild the configuration and open its database connection
     
     Args:
-        csv_path: Path to the CSV file
+        config_dict: Plain dictionary copy of the configuration sections
+        log_file: Log file of the parent process, or None if it did not set up logging
+    """
+    global _WORKER_CONFIG, _WORKER_QUERIES, logger
+    _WORKER_CONFIG = configparser.ConfigParser()
+    _WORKER_CONFIG.read_dict(config_dict)
+    _WORKER_QUERIES = (_WORKER_CONFIG["queries"]["ov_query"], _WORKER_CONFIG["queries"]["ome_query"])
+    
+    # Processes started with spawn/forkserver do not run the __main__ block, so set up
+    # logging here with the parent's format and log file (a no-op for forked workers)
+    if "logger" not in globals():
+        if log_file is not None:
+            setup_logger(log_file)
+        logger = logging.getLogger(Path(__file__).stem)
+    
+    # Connect up front; on failure process_serial_number retries and logs per serial number
+    try:
+        get_thread_cursor(_WORKER_CONFIG)
+    except Exception as e:
+        logger.warning(f"Worker {os.getpid()} could not connect to the database: {str(e)}")
+
+def _process_serial_in_worker(serial_number: Any) -> Dict[str, Any]:
+    """Process a serial number inside a worker process with its own configuration and connection"""
+    return process_serial_number(serial_number, _WORKER_CONFIG, *_WORKER_QUERIES)
+
+def process_serial_numbers_parallel(serial_numbers: List[Any], config: configparser.ConfigParser) -> List[Dict[str, Any]]:
+    """
+    Process serial numbers one query at a time, spread over worker processes or threads
+    
+    Args:
+        serial_numbers: Serial numbers to process
         config: ConfigParser object with configuration settings
         
     Returns:
-        True if successful, False otherwise
+        List of dictionaries with combined query results
     """
+    max_workers = int(config["processing"]["max_workers"])
+    worker_pool = config.get("processing", "worker_pool", fallback="thread")
+    results = []
+    
+    if worker_pool != "process":
+        # Each worker thread opens one connection lazily and keeps it for its serial numbers
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+        ov_query = config["queries"]["ov_query"]
+        ome_query = config["queries"]["ome_query"]
+        submit = lambda sn: executor.submit(process_serial_number, sn, config, ov_query, ome_query)
+    else:
+        # pyodbc holds the GIL for part of execute/fetch, so separate processes scale better;
+        # each process opens one connection in its initializer, closed when the process exits
+        config_dict = {section: dict(config[section]) for section in config.sections()}
+        executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=max_workers, initializer=_init_worker, initargs=(config_dict, LOG_FILE)
+        )
+        submit = lambda sn: executor.submit(_process_serial_in_worker, sn)
+    
     try:
-        # Read the CSV file
-        df = pd.read_csv(csv_path)
-        
-        # Check if serialNumber column exists
-        if 'serialNumber' not in df.columns:
-            logger.error(f"CSV file does not contain a 'serialNumber' column: {csv_path}")
-            return False
-        
-        # Get unique serial numbers
-        serial_numbers = df['serialNumber'].unique().tolist()
-        logger.info(f"Found {len(serial_numbers)} unique serial numbers in {csv_path}")
-        
-        # Process serial numbers in parallel
-        max_workers = int(config["processing"]["max_workers"])
-        results = []
-        
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_to_serial = {
-                executor.submit(process_serial_number, sn, config): sn 
-                for sn in serial_numbers
-            }
+        with executor:
+            future_to_serial = {submit(sn): sn for sn in serial_numbers}
             
             for i, future in enumerate(concurrent.futures.as_completed(future_to_serial)):
                 serial_number = future_to_serial[future]
@@ -251,31 +599,66 @@ def process_csv_file(csv_path: str, config: configparser.ConfigParser) -> bool:
                         
                 except Exception as e:
                     logger.error(f"Error processing {serial_number}: {str(e)}")
+    finally:
+        close_thread_connections()
+    
+    return results
+
+def process_csv_file(csv_path: str, config: configparser.ConfigParser, output_format: str = "csv") -> bool:
+    """
+    Process a CSV file by querying databases for each serial number
+    
+    Args:
+        csv_path: Path to the CSV file
+        config: ConfigParser object with configuration settings
+        output_format: "csv" to update the CSV file in place, or "parquet" to
+            write the results next to it with a .parquet suffix
+        
+    Returns:
+        True if successful, False otherwise
+    """
+    try:
+        # Read the CSV file; pyarrow infers timestamps and other types the C engine
+        # leaves as text, so when the CSV is rewritten in place its columns are read
+        # as text and written back as they were
+        read_options = {"dtype": str} if CSV_ENGINE == "pyarrow" and output_format == "csv" else {}
+        df = pd.read_csv(csv_path, engine=CSV_ENGINE, **read_options)
         
-        # Create a DataFrame from results
-        results_df = pd.DataFrame(results)
+        # Check if serialNumber column exists
+        if 'serialNumber' not in df.columns:
+            logger.error(f"CSV file does not contain a 'serialNumber' column: {csv_path}")
+            return False
+        
+        # Get unique serial numbers
+        serial_numbers = df['serialNumber'].unique().tolist()
+        logger.info(f"Found {len(serial_numbers)} unique serial numbers in {csv_path}")
+        
+        # Use batched queries when configured, otherwise query each serial number in parallel
+        if config.has_option("queries", "ov_batch_query") and config.has_option("queries", "ome_batch_query"):
+            results_df = process_serial_numbers_batch(serial_numbers, config)
+        else:
+            results_df = pd.DataFrame(process_serial_numbers_parallel(serial_numbers, config))
         
         # If no results, return
         if results_df.empty:
             logger.warning("No results retrieved from database")
             return False
         
-        # Merge with original DataFrame on serialNumber
-        merged_df = pd.merge(
-            df, 
-            results_df, 
-            how='left', 
-            left_on='serialNumber', 
-            right_on='SerialNumber'
-        )
-        
-        # Remove the redundant SerialNumber column if it exists
-        if 'SerialNumber' in merged_df.columns and 'SerialNumber' != 'serialNumber':
-            merged_df = merged_df.drop(columns=['SerialNumber'])
+        # Join onto the original DataFrame through the SerialNumber index; OV_/OME_
+        # columns written by an earlier run over this CSV are replaced by the new results
+        results_df = results_df.set_index('SerialNumber')
+        df = df.drop(columns=results_df.columns.intersection(df.columns))
+        merged_df = df.join(results_df, on='serialNumber', how='left')
         
-        # Save the result back to the same CSV file
-        merged_df.to_csv(csv_path, index=False)
-        logger.info(f"Successfully updated CSV file: {csv_path}")
+        if output_format == "parquet":
+            # Save the result as a compressed, typed Parquet file next to the CSV
+            parquet_path = Path(csv_path).with_suffix('.parquet')
+            merged_df.to_parquet(parquet_path, engine='pyarrow', compression='zstd', index=False)
+            logger.info(f"Successfully wrote Parquet file: {parquet_path}")
+        else:
+            # Save the result back to the same CSV file
+            merged_df.to_csv(csv_path, index=False)
+            logger.info(f"Successfully updated CSV file: {csv_path}")
         
         return True
         
@@ -288,6 +671,8 @@ def main():
     parser = argparse.ArgumentParser(description='Process server power data from CSV file')
     parser.add_argument('csv_path', help='Path to the CSV file containing serial numbers')
     parser.add_argument('--config', default='config.cfg', help='Path to configuration file')
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv',
+                        help='Output format: update the CSV in place or write a Parquet file next to it')
     args = parser.parse_args()
     
     # Check if CSV file exists
@@ -299,7 +684,7 @@ def main():
     config = load_config(args.config)
     
     # Process CSV file
-    success = process_csv_file(args.csv_path, config)
+    success = process_csv_file(args.csv_path, config, args.format)
     
     return 0 if success else 1
 
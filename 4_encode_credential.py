@@ -5,6 +5,7 @@ Python 3.6
 """
 
 import base64
+import functools
 import sys
 
 def simple_encrypt(text, key="default_key"):
@@ -17,12 +18,14 @@ def simple_encrypt(text, key="default_key"):
         print(f"Error encoding: {e}")
         return text
 
+@functools.lru_cache(maxsize=16)
 def simple_decrypt(encoded_text, key="default_key"):
     """Simple base64 decoding for verification"""
     try:
         decoded = base64.b64decode(encoded_text.encode()).decode()
-        if decoded.startswith(f"{key}:"):
-            return decoded[len(f"{key}:"):]
+        prefix = f"{key}:"
+        if decoded.startswith(prefix):
+            return decoded[len(prefix):]
         return decoded
     except Exception as e:
         print(f"Error decoding: {e}")
@@ -6,21 +6,52 @@ Compatible with Python 3.6.8 - uses only native libraries
 """
 
 import subprocess
+import asyncio
 import os
 import sys
 import json
 import csv
+import io
 import re
+import shlex
+import tempfile
 import argparse
 import configparser
 import base64
 import datetime
 import logging
 
+# orjson is optional, the stdlib json module is used when it isn't installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Setup logging
 LOG = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# Credential obfuscation key and its encoded "<key>:" prefix, built once
+DEFAULT_KEY = "default_key"
+DEFAULT_KEY_PREFIX = f"{DEFAULT_KEY}:".encode()
+
+# Maximum number of raidcom commands running at the same time
+MAX_CONCURRENT_COMMANDS = 8
+
+# OpenSSH connection sharing: send_scp_files opens one master connection that
+# the mkdir and scp calls reuse instead of handshaking again. Only the master
+# persists; the other calls never start one, since before OpenSSH 8.4 a
+# persisting master keeps its caller's stderr open and a reader waiting for
+# EOF there would stall until ControlPersist runs out
+SSH_CONTROL_PATH = "ControlPath=/tmp/ssh-cm-%r@%h:%p"
+SSH_CONTROL_OPTIONS = ["-o", "ControlMaster=no", "-o", SSH_CONTROL_PATH]
+SSH_MASTER_OPTIONS = ["-o", "ControlMaster=yes", "-o", SSH_CONTROL_PATH, "-o", "ControlPersist=60"]
+
+# Patterns for parsing raidcom output, compiled once
+_SERIAL_RE = re.compile(r'\b5\d{5}\b')
+_PORT_RE = re.compile(r'CL\d-[A-Z]-[A-Z]')
+_WWPN_RE = re.compile(r"([0-9a-fa-f]{16})")
+
 def load_config_file(config_file):
     """Load configuration from file"""
     config = configparser.ConfigParser()
@@ -36,24 +67,31 @@ def get_timestamp(format_type="epoch"):
     elif format_type == "5min":
         return datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
 
-def simple_encrypt(text, key="default_key"):
+def key_prefix(key):
+    """Get the encoded "<key>:" prefix, prebuilt for the default key"""
+    if key == DEFAULT_KEY:
+        return DEFAULT_KEY_PREFIX
+    return f"{key}:".encode()
+
+def simple_encrypt(text, key=DEFAULT_KEY):
     """Simple base64 encoding (replacement for Fernet)"""
     try:
         # Combine text with key for basic obfuscation
-        combined = f"{key}:{text}"
-        encoded = base64.b64encode(combined.encode()).decode()
+        encoded = base64.b64encode(key_prefix(key) + text.encode()).decode()
         return encoded
     except Exception as e:
         LOG.error(f"Error encoding: {e}")
         return text
 
-def simple_decrypt(encoded_text, key="default_key"):
+def simple_decrypt(encoded_text, key=DEFAULT_KEY):
     """Simple base64 decoding"""
     try:
-        decoded = base64.b64decode(encoded_text.encode()).decode()
-        if decoded.startswith(f"{key}:"):
-            return decoded[len(f"{key}:"):]
-        return decoded
+        # Stay in bytes until the prefix is stripped
+        decoded = base64.b64decode(encoded_text)
+        prefix = key_prefix(key)
+        if decoded.startswith(prefix):
+            return decoded[len(prefix):].decode()
+        return decoded.decode()
     except Exception as e:
         LOG.error(f"Error decoding: {e}")
         return encoded_text
@@ -66,11 +104,10 @@ def get_credentials(user_salt, password_salt, api_name):
     return username, password
 
 def run_command(command):
-    """Execute shell command and return output"""
+    """Execute command (argv list, no shell) and return output"""
     try:
         result = subprocess.run(
             command,
-            shell=True,
             check=True,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
@@ -78,64 +115,90 @@ def run_command(command):
         )
         return result.stdout
     except subprocess.CalledProcessError as e:
-        LOG.error(f"Error executing command: {command}")
+        LOG.error(f"Error executing command: {' '.join(command)}")
         LOG.info(f"Error message: {e.stderr}")
         sys.exit(1)
 
-def send_scp_file(user, file_path, remote_server, remote_path):
-    """Send file to remote server using SCP"""
+async def run_command_async(command, semaphore):
+    """Execute command (argv list, no shell) without blocking other commands"""
+    async with semaphore:
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        stdout, stderr = await process.communicate()
+    
+    if process.returncode != 0:
+        LOG.error(f"Error executing command: {' '.join(command)}")
+        LOG.info(f"Error message: {stderr.decode()}")
+        sys.exit(1)
+    return stdout.decode()
+
+def open_ssh_master(remote_target):
+    """Open a shared SSH connection to the remote server, return True if it is up"""
+    # The master stays in the background (ControlPersist) after `true` exits and
+    # inherits stderr, so that goes to a file rather than a pipe nobody would close
+    with tempfile.TemporaryFile() as stderr_file:
+        result = subprocess.run(
+            ["ssh", *SSH_MASTER_OPTIONS, remote_target, "true"],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=stderr_file,
+        )
+        if result.returncode != 0:
+            stderr_file.seek(0)
+            LOG.warning(f"Could not open shared SSH connection to {remote_target}: {stderr_file.read().decode(errors='replace')}")
+            return False
+    return True
+
+def close_ssh_master(remote_target):
+    """Close the shared SSH connection"""
+    subprocess.run(
+        ["ssh", *SSH_CONTROL_OPTIONS, "-O", "exit", remote_target],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+def send_scp_files(user, file_paths, remote_server, remote_path):
+    """Send files to remote server using a single SCP session"""
+    remote_target = f"{user}@{remote_server}"
+    file_list = ", ".join(file_paths)
+    
+    # mkdir and scp share one connection when the master opens, otherwise they connect on their own
+    shared_connection = open_ssh_master(remote_target)
     try:
-        # Prepare catalog on remote server
-        remote_mkdir_command = f"ssh {user}@{remote_server} mkdir -p {remote_path}"
-        remote_create_catalog = subprocess.run(
+        # Prepare catalog on remote server; the remote shell splits its command
+        # line, and the path holds the run's "%Y-%m-%d %H:%M" time, so it is quoted
+        remote_mkdir_command = ["ssh", *SSH_CONTROL_OPTIONS, remote_target, "mkdir", "-p", shlex.quote(remote_path)]
+        subprocess.run(
             remote_mkdir_command,
-            shell=True,
             check=True,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             universal_newlines=True,
         )
-        
-        if remote_create_catalog.returncode != 0:
-            raise subprocess.CalledProcessError(
-                remote_create_catalog.returncode, remote_mkdir_command
-            )
 
-        # SCP command
-        scp_command = f"scp {file_path} {user}@{remote_server}:{remote_path}"
-        result = subprocess.run(
+        # SCP command, all files go over one connection; the scp protocol also
+        # passes the target path through the remote shell. scp exits non-zero
+        # if any file fails, so no remote listing is needed
+        scp_command = ["scp", *SSH_CONTROL_OPTIONS, *file_paths, f"{remote_target}:{shlex.quote(remote_path)}"]
+        subprocess.run(
             scp_command,
-            shell=True,
             check=True,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             universal_newlines=True,
         )
         
-        if result.returncode != 0:
-            raise subprocess.CalledProcessError(result.returncode, scp_command)
-        
-        # Check if file was sent successfully
-        if not os.path.exists(file_path):
-            LOG.error(f"File {file_path} does not exist after sending.")
-        else:
-            # Check if the file exists on the remote server
-            remote_check_result = subprocess.run(
-                f"ssh {user}@{remote_server} ls {remote_path}",
-                shell=True,
-                capture_output=True,
-                text=True,
-            )
-            if remote_check_result.returncode == 0:
-                raise subprocess.CalledProcessError(
-                    remote_check_result.returncode, "File not found on remote server"
-                )
-        
-        LOG.info(f"File {file_path} exists on the remote server {remote_server}")
+        LOG.info(f"Files {file_list} exist on the remote server {remote_server}")
         
     except subprocess.CalledProcessError as e:
-        LOG.error(f"Error sending file {file_path}: {e.stderr}")
+        LOG.error(f"Error sending files {file_list}: {e.stderr}")
         sys.exit(1)
+    finally:
+        if shared_connection:
+            close_ssh_master(remote_target)
 
 def save_meta_json(filename, batch_epoch, column, region):
     """Save data to CSV file metadata"""
@@ -153,29 +216,28 @@ def save_meta_json(filename, batch_epoch, column, region):
     }
     
     # Save as JSON
-    with open(filename, "w") as f:
-        json.dump(data, f, indent=4)
+    if orjson is not None:
+        with open(filename, "wb") as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(filename, "w") as f:
+            json.dump(data, f, indent=2)
 
 def parse_csv_content(content, separator=","):
     """Parse CSV-like content into list of dictionaries"""
-    lines = content.strip().split('\n')
-    if not lines:
-        return []
+    reader = csv.reader(io.StringIO(content.strip()), delimiter=separator, skipinitialspace=True)
     
     # Get headers from first line
-    headers = [h.strip() for h in lines[0].split(separator)]
-    
-    data = []
-    for line in lines[1:]:
-        if line.strip():
-            values = [v.strip() for v in line.split(separator)]
-            if len(values) >= len(headers):
-                row_dict = {}
-                for i, header in enumerate(headers):
-                    row_dict[header] = values[i] if i < len(values) else ""
-                data.append(row_dict)
+    headers = [h.strip() for h in next(reader, [])]
+    if not headers:
+        return []
     
-    return data
+    # Blank lines come back as empty rows and are skipped by the length check
+    return [
+        dict(zip(headers, (v.strip() for v in values)))
+        for values in reader
+        if len(values) >= len(headers)
+    ]
 
 def write_csv_file(filename, data, fieldnames=None):
     """Write data to CSV file"""
@@ -185,20 +247,98 @@ def write_csv_file(filename, data, fieldnames=None):
     if fieldnames is None:
         fieldnames = list(data[0].keys()) if data else []
     
+    # Plain rows in field order skip DictWriter's per-row key checks
     with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(data)
+        writer = csv.writer(csvfile)
+        writer.writerow(fieldnames)
+        writer.writerows([row.get(name, "") for name in fieldnames] for row in data)
 
-def calculate_percentage(monitor_kbps, spml_limit_kbps):
-    """Calculate percentage with 2 decimal places"""
-    try:
-        if monitor_kbps and spml_limit_kbps and float(spml_limit_kbps) > 0:
-            return round((float(monitor_kbps) / float(spml_limit_kbps)) * 100, 2)
-        else:
-            return 0
-    except (ValueError, ZeroDivisionError):
-        return 0
+async def fetch_spm_output(port_id, host_wwpn, inst, semaphore):
+    """Get SPM monitoring data for one WWPN on a port"""
+    spm_cmd = [
+        "raidcom", "get", "spm_wwn", "-port", port_id, "-hba_wwn", host_wwpn,
+        "-s", str(inst), "-IH{HORCMINST}", f"-T{inst}",
+    ]
+    return await run_command_async(spm_cmd, semaphore)
+
+async def collect_port_spm_data(port_id, array_serial, inst, time_epoch, semaphore):
+    """Collect SPM data for all WWPNs on a port"""
+    port_spm_data = []
+    LOG.info(f"Check spm_wwn in array {array_serial} for port {port_id}...")
+    
+    # Get SPM WWN information for this port
+    host_cmd = ["raidcom", "get", "spm_wwn", "-port", port_id, "-s", str(inst), "-IH{HORCMINST}", f"-T{inst}"]
+    host_output = await run_command_async(host_cmd, semaphore)
+    
+    if not host_output:
+        LOG.warning(f"No data found for port {port_id}.")
+        return port_spm_data
+    
+    LOG.info(f"Data found in host_output. for port {port_id}, {len(host_output)} lines")
+    
+    # Parse host data as CSV
+    host_data = parse_csv_content(host_output, separator=" ")
+    
+    if not host_data:
+        LOG.info(f"Data found in host_output. in port {port_id}.")
+        return port_spm_data
+    
+    # Extract WWPNs
+    wwpns = _WWPN_RE.findall(host_output)
+    LOG.info(f"Found wwpns: {wwpns}")
+    
+    # Get SPM monitoring data for all WWPNs concurrently
+    spm_outputs = await asyncio.gather(*(
+        fetch_spm_output(port_id, host_wwpn, inst, semaphore) for host_wwpn in wwpns
+    ))
+    
+    for host_wwpn, spm_output in zip(wwpns, spm_outputs):
+        # Parse SPM output
+        spm_data = parse_csv_content(spm_output, separator=" ")
+        
+        if spm_data:
+            # Extract required fields and add to collection
+            for row in spm_data:
+                # Extract values from the parsed data
+                spm_value = row.get('KBps', '')
+                spm_priority = row.get('Pri', '')
+                
+                # Find host nickname from the data
+                host_nickname = ""
+                nickname_match = re.search(r'10009440c9d0b045', host_output)
+                if nickname_match:
+                    host_group = re.findall(r'host_pattern, host_nickname\.values\[0\]', host_output)
+                    if host_group:
+                        host_nickname = host_group[0]
+                
+                # Format WWPN with colons for readability
+                formatted_wwpn = ":".join([
+                    host_wwpn[i : i + 2] for i in range(0, len(host_wwpn), 2)
+                ])
+                
+                # Parse SPM output to extract monitoring data
+                spm_lines = spm_output.strip().split('\n')
+                if len(spm_lines) > 1:  # Header + data
+                    for line in spm_lines[1:]:
+                        parts = line.split()
+                        if len(parts) >= 4:
+                            spm_data_entry = {
+                                "ArraySerial": array_serial,
+                                "ArrayPort": port_id,
+                                "HostNickname": host_nickname if host_nickname else "Unknown",
+                                "HostGroup": host_group[0] if 'host_group' in locals() else "",
+                                "HostWWPN": formatted_wwpn,
+                                "MonitorIOps": int(parts[2]) if parts[2].isdigit() else 0,
+                                "MonitorKBps": int(parts[3]) if parts[3].isdigit() else 0,
+                                "SPMLimitKBps": int(spm_value) if 'spm_value' in locals() and spm_value.isdigit() else 0,
+                                "SPMPriority": spm_priority if 'spm_priority' in locals() else "",
+                                "SourceLoadTimeEpoch": time_epoch,
+                                "SourceName": "HostIOLimit",
+                                "BatchCreateTimeEpoch": time_epoch,
+                            }
+                            port_spm_data.append(spm_data_entry)
+    
+    return port_spm_data
 
 def main():
     try:
@@ -255,15 +395,15 @@ def main():
         # Login to instance 99
         LOG.info(f"Login to raidcom with user: {args.username} and Inst: {args.inst} and Region {args.region}")
         
-        login_cmd = f"raidcom -login {args.username} {args.password} -I{args.inst}"
+        login_cmd = ["raidcom", "-login", args.username, args.password, f"-I{args.inst}"]
         run_command(login_cmd)
 
         # Get storage array serial number
         LOG.info(f"Getting storage array from Region {region}, Horcm Inst :{args.inst}")
-        raidcm_output = run_command(f"raidcom get port -s {args.inst}")
+        raidcm_output = run_command(["raidcom", "get", "port", "-s", str(args.inst)])
 
         # Extract serials from output
-        serial_match = re.search(r'\b5\d{5}\b', raidcm_output)
+        serial_match = _SERIAL_RE.search(raidcm_output)
         
         if not serial_match:
             LOG.warning("Problem with get Storage Array Serial number")
@@ -273,110 +413,46 @@ def main():
         LOG.info(f"Start check IOLIMIT for Serial number: {array_serial}")
 
         # Get port information
-        port_cmd = f"raidcom get port -s {args.inst} -IH{{HORCMINST}} |grep {args.inst}"
-        port_output = run_command(port_cmd)
+        port_cmd = ["raidcom", "get", "port", "-s", str(args.inst), "-IH{HORCMINST}"]
+        port_output = "\n".join(
+            line for line in run_command(port_cmd).splitlines() if str(args.inst) in line
+        )
 
         # Parse port output to get port IDs
-        port_ids = re.findall(r'CL\d-[A-Z]-[A-Z]', port_output)
+        port_ids = _PORT_RE.findall(port_output)
 
-        # Initialize data collection
-        all_spm_data = []
+        # Initialize data collection, keyed by (HostNickname, ArrayPort, HostWWPN)
+        # so duplicates are dropped while collecting
+        all_spm_data = {}
 
-        # For each port, check host groups and WWPNs
-        for port_id in port_ids:
-            LOG.info(f"Check spm_wwn in array {array_serial} for port {port_id}...")
-            
-            # Get SPM WWN information for this port
-            host_cmd = f"raidcom get spm_wwn -port {port_id} -s {args.inst} -IH{{HORCMINST}} -T{args.inst}"
-            host_output = run_command(host_cmd)
-            
-            if not host_output:
-                LOG.warning(f"No data found for port {port_id}.")
-                continue
-            else:
-                LOG.info(f"Data found in host_output. for port {port_id}, {len(host_output)} lines")
-                
-                # Parse host data as CSV
-                host_data = parse_csv_content(host_output, separator=" ")
-                
-                if not host_data:
-                    LOG.info(f"Data found in host_output. in port {port_id}.")
-                    continue
-                
-                # Extract WWPNs
-                wwpns_pattern = r"([0-9a-fa-f]{16})"
-                wwpns = re.findall(wwpns_pattern, host_output)
-                LOG.info(f"Found wwpns: {wwpns}")
-                
-                for host_wwpn in wwpns:
-                    # Get SPM monitoring data for each WWPN
-                    spm_cmd = f"raidcom get spm_wwn -port {port_id} -hba_wwn {host_wwpn} -s {args.inst} -IH{{HORCMINST}} -T{args.inst}"
-                    spm_output = run_command(spm_cmd)
-                    
-                    # Parse SPM output
-                    spm_data = parse_csv_content(spm_output, separator=" ")
-                    
-                    if spm_data:
-                        # Extract required fields and add to collection
-                        for row in spm_data:
-                            # Extract values from the parsed data
-                            spm_value = row.get('KBps', '')
-                            spm_priority = row.get('Pri', '')
-                            
-                            # Find host nickname from the data
-                            host_nickname = ""
-                            nickname_match = re.search(r'10009440c9d0b045', host_output)
-                            if nickname_match:
-                                host_group = re.findall(r'host_pattern, host_nickname\.values\[0\]', host_output)
-                                if host_group:
-                                    host_nickname = host_group[0]
-                            
-                            # Format WWPN with colons for readability
-                            formatted_wwpn = ":".join([
-                                host_wwpn[i : i + 2] for i in range(0, len(host_wwpn), 2)
-                            ])
-                            
-                            # Parse SPM output to extract monitoring data
-                            spm_lines = spm_output.strip().split('\n')
-                            if len(spm_lines) > 1:  # Header + data
-                                for line in spm_lines[1:]:
-                                    parts = line.split()
-                                    if len(parts) >= 4:
-                                        spm_data_entry = {
-                                            "ArraySerial": array_serial,
-                                            "ArrayPort": port_id,
-                                            "HostNickname": host_nickname if host_nickname else "Unknown",
-                                            "HostGroup": host_group[0] if 'host_group' in locals() else "",
-                                            "HostWWPN": formatted_wwpn,
-                                            "MonitorIOps": int(parts[2]) if parts[2].isdigit() else 0,
-                                            "MonitorKBps": int(parts[3]) if parts[3].isdigit() else 0,
-                                            "SPMLimitKBps": int(smp_value) if 'spm_value' in locals() and spm_value.isdigit() else 0,
-                                            "SPMPriority": spm_priority if 'spm_priority' in locals() else "",
-                                            "SourceLoadTimeEpoch": TIME_EPOCH,
-                                            "SourceName": "HostIOLimit",
-                                            "BatchCreateTimeEpoch": TIME_EPOCH,
-                                        }
-                                        all_spm_data.append(spm_data_entry)
+        # Query all ports concurrently, results keep the port order
+        # (explicit loop instead of asyncio.run, which Python 3.6 doesn't have)
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            semaphore = asyncio.Semaphore(MAX_CONCURRENT_COMMANDS)
+            port_results = loop.run_until_complete(asyncio.gather(*(
+                collect_port_spm_data(port_id, array_serial, args.inst, TIME_EPOCH, semaphore)
+                for port_id in port_ids
+            )))
+        finally:
+            loop.close()
+        for port_data in port_results:
+            for item in port_data:
+                key = (item["HostNickname"], item["ArrayPort"], item["HostWWPN"])
+                all_spm_data.setdefault(key, item)
 
         # Create DataFrame equivalent and save to CSV
         if all_spm_data:
-            # Remove duplicates based on specific columns
-            seen = set()
-            unique_data = []
-            for item in all_spm_data:
-                key = (item["HostNickname"], item["ArrayPort"], item["HostWWPN"])
-                if key not in seen:
-                    seen.add(key)
-                    unique_data.append(item)
+            unique_data = list(all_spm_data.values())
             
-            # Calculate percentage utilization
+            # Calculate percentage utilization, both columns are always parsed to int
             for row in unique_data:
-                if "MonitorKBps" in row and "SPMLimitKBps" in row:
-                    row["SPMLimitUtilPct"] = calculate_percentage(
-                        row["MonitorKBps"], row["SPMLimitKBps"]
-                    )
-                else:
-                    LOG.warning("Required columns 'MonitorKBps' and 'SPMLimitKBps' are missing in DataFrame.")
+                monitor_kbps = row["MonitorKBps"]
+                limit_kbps = row["SPMLimitKBps"]
+                row["SPMLimitUtilPct"] = (
+                    round(monitor_kbps / limit_kbps * 100, 2) if monitor_kbps and limit_kbps > 0 else 0
+                )
             
             # Generate timestamp for filename
             timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -401,8 +477,7 @@ def main():
             
             # Send files to remote server using SCP
             scp_path_time = f"{scp_path}/{TIME_5MIN}"
-            send_scp_file(scp_user, csv_filename, scp_server, scp_path_time)
-            send_scp_file(scp_user, meta_filename, scp_server, scp_path_time)
+            send_scp_files(scp_user, [csv_filename, meta_filename], scp_server, scp_path_time)
             
             LOG.info(f"File {csv_filename} and {meta_filename} sent to {scp_server}:{scp_path_time}")
             
@@ -411,7 +486,7 @@ def main():
 
         # Logout from instance 99
         LOG.info(f"Logout from inst {args.inst}...")
-        logout_cmd = f"raidcom -logout -I{args.inst}"
+        logout_cmd = ["raidcom", "-logout", f"-I{args.inst}"]
         run_command(logout_cmd)
 
     except Exception as e:
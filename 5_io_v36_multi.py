@@ -9,38 +9,86 @@ import subprocess
 import os
 import sys
 import json
+import tempfile
 import csv
+import io
 import re
+import shlex
 import argparse
 import configparser
 import base64
+import collections
 import datetime
+import functools
+import itertools
 import logging
 import threading
+import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Setup logging with thread safety
 LOG = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - [%(threadName)s] - %(message)s')
 
-# Thread lock for shared data access
-data_lock = threading.Lock()
-all_spm_data = []
+# Report columns; records are namedtuples in this order, so they are written as plain rows
+SPM_FIELDNAMES = [
+    "HostNickname", "ArrayPort", "HostGroup", "HostWWPN", "ArraySerial",
+    "MonitorIOps", "MonitorKBps", "SPMLimitKBps", "SPMPriority",
+    "SPMLimitUtilPct", "SourceLoadTimeEpoch", "SourceName", "BatchCreateTimeEpoch"
+]
+SpmEntry = collections.namedtuple("SpmEntry", SPM_FIELDNAMES)
+
+# Maximum number of raidcom commands running at the same time, whatever --threads is set to
+MAX_CONCURRENT_COMMANDS = 8
+command_semaphore = threading.BoundedSemaphore(MAX_CONCURRENT_COMMANDS)
+
+# Patterns for parsing raidcom output, compiled once and shared by all worker threads
+_SERIAL_RE = re.compile(r'\b5\d{4}\b')
+_PORT_RE = re.compile(r'CL\d-[A-Z]-[A-Z]')
+_WWPN_RE = re.compile(r"([0-9a-fA-F]{16})")
+_NICKNAME_WWPN_RE = re.compile(r'10009440c9d0b045')
+_HOST_GROUP_RE = re.compile(r'host_pattern, host_nickname\.values\[0\]')
+_WS_RE = re.compile(r'[ \t]+')
+_EDGE_SPACE_RE = re.compile(r'^ | $', re.MULTILINE)
+
+# OpenSSH connection sharing: the first ssh call opens a master connection
+# that later transfers to the same host reuse instead of handshaking again
+SSH_CONTROL_OPTIONS = [
+    "-o", "ControlMaster=auto",
+    "-o", "ControlPath=/tmp/ssh-cm-%r@%h:%p",
+    "-o", "ControlPersist=60",
+]
+
+# Transfer tuning: the CSV text compresses well, AES-GCM uses the CPU's AES instructions
+# (aes128-ctr as fallback), and the DSCP marking asks for throughput over latency.
+# With connection sharing these apply to the master connection, which the transfer opens.
+SSH_TRANSFER_OPTIONS = [
+    "-o", "Compression=yes",
+    "-c", "aes128-gcm@openssh.com,aes128-ctr",
+    "-o", "IPQoS=throughput",
+]
 
 def load_config_file(config_file):
-    """Load configuration from file"""
+    """Load configuration from file as a plain {section: {key: value}} dict"""
     config = configparser.ConfigParser()
     config.read(config_file)
-    return config
+    return {section: dict(config.items(section)) for section in config.sections()}
 
 def get_timestamp(format_type="epoch"):
     """Get timestamp in different formats"""
+    # Formatted at most once per second per format, none of the formats go below seconds
+    return _format_timestamp(format_type, int(time.time()))
+
+@functools.lru_cache(maxsize=8)
+def _format_timestamp(format_type, epoch_seconds):
+    """Format a whole-second epoch timestamp"""
     if format_type == "epoch":
-        return str(int(datetime.datetime.now().timestamp()))
-    elif format_type == "days":
-        return datetime.datetime.now().strftime("%Y-%m-%d")
+        return str(epoch_seconds)
+    now = datetime.datetime.fromtimestamp(epoch_seconds)
+    if format_type == "days":
+        return now.strftime("%Y-%m-%d")
     elif format_type == "5min":
-        return datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
+        return now.strftime("%Y-%m-%d %H:%M")
 
 def simple_encrypt(text, key="default_key"):
     """Simple base64 encoding (replacement for Fernet)"""
@@ -72,75 +120,86 @@ def get_credentials(user_salt, password_salt, api_name):
     return username, password
 
 def run_command(command):
-    """Execute shell command and return output"""
+    """Execute command (argv list, no shell) and return output"""
     try:
-        result = subprocess.run(
-            command,
-            shell=True,
-            check=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            universal_newlines=True,
-        )
+        # No shell and no fd-closing loop, so newer Pythons can start it with posix_spawn;
+        # pipes are created non-inheritable, so keeping fds open is safe across threads
+        with command_semaphore:
+            result = subprocess.run(
+                command,
+                check=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                universal_newlines=True,
+                close_fds=False,
+            )
         return result.stdout
     except subprocess.CalledProcessError as e:
-        LOG.error(f"Error executing command: {command}")
+        LOG.error(f"Error executing command: {' '.join(command)}")
         LOG.info(f"Error message: {e.stderr}")
         sys.exit(1)
 
-def send_scp_file(user, file_path, remote_server, remote_path):
-    """Send file to remote server using SCP"""
-    try:
-        # Prepare catalog on remote server
-        remote_mkdir_command = f"ssh {user}@{remote_server} mkdir -p {remote_path}"
-        remote_create_catalog = subprocess.run(
-            remote_mkdir_command,
-            shell=True,
-            check=True,
+def read_command_lines(command):
+    """Execute command (argv list, no shell) and return its output lines"""
+    # stderr goes to a temporary file: a pipe only read after stdout ends would block
+    # raidcom once it filled up with error output. The output is read to the end
+    # line by line while the command slot is held, then the slot is released
+    with command_semaphore, tempfile.TemporaryFile() as stderr_file:
+        process = subprocess.Popen(
+            command,
             stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
+            stderr=stderr_file,
             universal_newlines=True,
+            close_fds=False,
         )
-        
-        if remote_create_catalog.returncode != 0:
-            raise subprocess.CalledProcessError(
-                remote_create_catalog.returncode, remote_mkdir_command
-            )
+        lines = [line.rstrip("\n") for line in process.stdout]
+        process.wait()
+        stderr_file.seek(0)
+        stderr = stderr_file.read().decode(errors="replace")
+    
+    if process.returncode != 0:
+        LOG.error(f"Error executing command: {' '.join(command)}")
+        LOG.info(f"Error message: {stderr}")
+        sys.exit(1)
+    return lines
 
-        # SCP command
-        scp_command = f"scp {file_path} {user}@{remote_server}:{remote_path}"
-        result = subprocess.run(
-            scp_command,
-            shell=True,
-            check=True,
+def send_files(user, file_paths, remote_server, remote_path):
+    """Send files to remote server as one tar stream over a single SSH session"""
+    remote_target = f"{user}@{remote_server}"
+    file_list = ", ".join(file_paths)
+    try:
+        # Pack the files without their local directories (absolute -C, GNU tar applies them cumulatively)
+        tar_command = ["tar", "-cf", "-"]
+        for file_path in file_paths:
+            tar_command += ["-C", os.path.dirname(os.path.abspath(file_path)), os.path.basename(file_path)]
+        
+        # Prepare catalog on remote server and unpack in the same session
+        quoted_path = shlex.quote(remote_path)
+        ssh_command = ["ssh", *SSH_CONTROL_OPTIONS, *SSH_TRANSFER_OPTIONS, remote_target, f"mkdir -p {quoted_path} && tar -xf - -C {quoted_path}"]
+        
+        tar_process = subprocess.Popen(tar_command, stdout=subprocess.PIPE)
+        ssh_process = subprocess.Popen(
+            ssh_command,
+            stdin=tar_process.stdout,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             universal_newlines=True,
         )
+        # Let tar get SIGPIPE if ssh exits early
+        tar_process.stdout.close()
+        ssh_stdout, ssh_stderr = ssh_process.communicate()
+        tar_process.wait()
         
-        if result.returncode != 0:
-            raise subprocess.CalledProcessError(result.returncode, scp_command)
-        
-        # Check if file was sent successfully
-        if not os.path.exists(file_path):
-            LOG.error(f"File {file_path} does not exist after sending.")
-        else:
-            # Check if the file exists on the remote server
-            remote_check_result = subprocess.run(
-                f"ssh {user}@{remote_server} ls {remote_path}",
-                shell=True,
-                capture_output=True,
-                text=True,
-            )
-            if remote_check_result.returncode == 0:
-                raise subprocess.CalledProcessError(
-                    remote_check_result.returncode, "File not found on remote server"
-                )
+        if tar_process.returncode != 0:
+            raise subprocess.CalledProcessError(tar_process.returncode, tar_command, stderr="tar failed")
+        if ssh_process.returncode != 0:
+            raise subprocess.CalledProcessError(ssh_process.returncode, ssh_command, ssh_stdout, ssh_stderr)
         
-        LOG.info(f"File {file_path} exists on the remote server {remote_server}")
+        # tar and ssh both exited 0, so the files were unpacked on the remote server
+        LOG.info(f"Files {file_list} sent to the remote server {remote_server}")
         
     except subprocess.CalledProcessError as e:
-        LOG.error(f"Error sending file {file_path}: {e.stderr}")
+        LOG.error(f"Error sending files {file_list}: {e.stderr}")
         sys.exit(1)
 
 def save_meta_json(filename, batch_epoch, column, region):
@@ -163,49 +222,58 @@ def save_meta_json(filename, batch_epoch, column, region):
         json.dump(data, f, indent=4)
 
 def parse_csv_content(content, separator=","):
-    """Parse CSV-like content into list of dictionaries"""
-    lines = content.strip().split('\n')
-    if not lines:
-        return []
+    """Parse CSV-like content (a string or an iterable of lines) into list of dictionaries"""
+    if separator == " ":
+        # raidcom pads columns with runs of spaces: collapse them to one space and trim
+        # each line, in one regex pass over the whole text where possible
+        if isinstance(content, str):
+            content = _EDGE_SPACE_RE.sub("", _WS_RE.sub(" ", content))
+        else:
+            content = (_WS_RE.sub(" ", line).strip() for line in content)
     
-    # Get headers from first line
-    headers = [h.strip() for h in lines[0].split(separator)]
+    if isinstance(content, str):
+        content = io.StringIO(content.strip())
+    reader = csv.reader(content, delimiter=separator, skipinitialspace=True)
     
-    data = []
-    for line in lines[1:]:
-        if line.strip():
-            values = [v.strip() for v in line.split(separator)]
-            if len(values) >= len(headers):
-                row_dict = {}
-                for i, header in enumerate(headers):
-                    row_dict[header] = values[i] if i < len(values) else ""
-                data.append(row_dict)
+    # Get headers from first line
+    headers = [h.strip() for h in next(reader, [])]
+    if not headers:
+        return []
     
-    return data
+    # Blank lines come back as empty rows and are skipped by the length check
+    return [
+        dict(zip(headers, (v.strip() for v in values)))
+        for values in reader
+        if len(values) >= len(headers)
+    ]
 
 def write_csv_file(filename, data, fieldnames=None):
-    """Write data to CSV file"""
-    if not data:
-        return
+    """Write data (any iterable of namedtuples or sequences in fieldnames order) to CSV file"""
+    rows = iter(data)
     
     if fieldnames is None:
-        fieldnames = list(data[0].keys()) if data else []
+        first_row = next(rows, None)
+        if first_row is None:
+            return
+        fieldnames = list(first_row._fields)
+        rows = itertools.chain([first_row], rows)
     
-    with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(data)
+    # Rows are written as they are produced, through a 1 MiB write buffer
+    with open(filename, 'w', newline='', encoding='utf-8', buffering=1 << 20) as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(fieldnames)
+        writer.writerows(rows)
 
 def get_serial_numbers(instance):
     """Get all serial numbers from raidqry -l command"""
     try:
-        cmd = f"raidqry -l -I{instance}"
-        LOG.info(f"Getting serial numbers with command: {cmd}")
+        cmd = ["raidqry", "-l", f"-I{instance}"]
+        LOG.info(f"Getting serial numbers with command: {' '.join(cmd)}")
         
         output = run_command(cmd)
         
         # Extract serial numbers (assuming 5-digit numbers starting with 5)
-        serial_numbers = re.findall(r'\b5\d{4}\b', output)
+        serial_numbers = _SERIAL_RE.findall(output)
         
         if not serial_numbers:
             LOG.warning("No serial numbers found from raidqry command")
@@ -226,13 +294,8 @@ def get_serial_numbers(instance):
         LOG.error(f"Error getting serial numbers: {e}")
         return []
 
-def chunk_list(lst, chunk_size):
-    """Divide list into chunks of specified size"""
-    for i in range(0, len(lst), chunk_size):
-        yield lst[i:i + chunk_size]
-
 def process_serial_number(serial_number, args, TIME_EPOCH, TIME_DAYS, TIME_5MIN):
-    """Process a single serial number to collect SPM data"""
+    """Process a single serial number and return its SPM records"""
     thread_name = threading.current_thread().name
     LOG.info(f"[{thread_name}] Processing serial number: {serial_number}")
     
@@ -240,13 +303,15 @@ def process_serial_number(serial_number, args, TIME_EPOCH, TIME_DAYS, TIME_5MIN)
         local_spm_data = []
         
         # Get port information for this serial number
-        port_cmd = f"raidcom get port -s {serial_number} -IH{{{args.inst}}} |grep {args.inst}"
+        port_cmd = ["raidcom", "get", "port", "-s", serial_number, f"-IH{{{args.inst}}}"]
         LOG.info(f"[{thread_name}] Getting ports for serial {serial_number}")
         
-        port_output = run_command(port_cmd)
-        
-        # Parse port output to get port IDs
-        port_ids = re.findall(r'CL\d-[A-Z]-[A-Z]', port_output)
+        # Parse port output to get port IDs, only from the lines for this instance (was "| grep <inst>")
+        port_ids = [
+            port_id
+            for line in read_command_lines(port_cmd) if str(args.inst) in line
+            for port_id in _PORT_RE.findall(line)
+        ]
         LOG.info(f"[{thread_name}] Found {len(port_ids)} ports for serial {serial_number}: {port_ids}")
         
         # For each port, check host groups and WWPNs
@@ -254,107 +319,86 @@ def process_serial_number(serial_number, args, TIME_EPOCH, TIME_DAYS, TIME_5MIN)
             LOG.info(f"[{thread_name}] Check spm_wwn in array {serial_number} for port {port_id}...")
             
             # Get SPM WWN information for this port
-            host_cmd = f"raidcom get spm_wwn -port {port_id} -s {serial_number} -IH{{{args.inst}}} -T{args.inst}"
-            host_output = run_command(host_cmd)
+            host_cmd = [
+                "raidcom", "get", "spm_wwn", "-port", port_id, "-s", serial_number,
+                f"-IH{{{args.inst}}}", f"-T{args.inst}",
+            ]
+            host_lines = [line for line in read_command_lines(host_cmd) if line.strip()]
             
-            if not host_output:
+            if not host_lines:
                 LOG.warning(f"[{thread_name}] No data found for port {port_id} on serial {serial_number}")
                 continue
             else:
-                LOG.info(f"[{thread_name}] Data found in host_output for port {port_id}, {len(host_output)} lines")
+                LOG.info(f"[{thread_name}] Data found in host_output for port {port_id}, {len(host_lines)} lines")
                 
                 # Parse host data as CSV
-                host_data = parse_csv_content(host_output, separator=" ")
+                host_data = parse_csv_content(host_lines, separator=" ")
                 
-                if not host_data:
+                # The monitor counters are the third and fourth columns
+                columns = list(host_data[0]) if host_data else []
+                if len(columns) < 4:
                     LOG.info(f"[{thread_name}] No parseable data found in host_output for port {port_id}")
                     continue
+                iops_column, kbps_column = columns[2], columns[3]
                 
-                # Extract WWPNs
-                wwpns_pattern = r"([0-9a-fa-f]{16})"
-                wwpns = re.findall(wwpns_pattern, host_output)
-                LOG.info(f"[{thread_name}] Found wwpns: {wwpns}")
+                # Index the parsed rows by WWPN (the first 16 hex digit field): the port output already
+                # holds every WWPN's row, so "raidcom get spm_wwn -hba_wwn" per WWPN is not needed
+                rows_by_wwpn = {}
+                for row in host_data:
+                    wwpn_match = next(filter(None, map(_WWPN_RE.search, row.values())), None)
+                    if wwpn_match:
+                        rows_by_wwpn.setdefault(wwpn_match.group(1), []).append(row)
+                LOG.info(f"[{thread_name}] Found wwpns: {list(rows_by_wwpn)}")
                 
-                for host_wwpn in wwpns:
-                    # Get SPM monitoring data for each WWPN
-                    spm_cmd = f"raidcom get spm_wwn -port {port_id} -hba_wwn {host_wwpn} -s {serial_number} -IH{{{args.inst}}} -T{args.inst}"
-                    spm_output = run_command(spm_cmd)
-                    
-                    # Parse SPM output
-                    spm_data = parse_csv_content(spm_output, separator=" ")
+                # Find host nickname from the data, it only depends on the port output
+                host_group = []
+                if any(_NICKNAME_WWPN_RE.search(line) for line in host_lines):
+                    host_group = [group for line in host_lines for group in _HOST_GROUP_RE.findall(line)]
+                host_nickname = host_group[0] if host_group else "Unknown"
+                host_group_name = host_group[0] if host_group else ""
+                
+                def build_entry(formatted_wwpn, row):
+                    """Build one SPM record for this port from a parsed WWPN row"""
+                    monitor_kbps = _to_int(row[kbps_column])
+                    spm_limit_kbps = _to_int(row.get('KBps'))
+                    return SpmEntry(
+                        HostNickname=host_nickname,
+                        ArrayPort=port_id,
+                        HostGroup=host_group_name,
+                        HostWWPN=formatted_wwpn,
+                        ArraySerial=serial_number,
+                        MonitorIOps=_to_int(row[iops_column]),
+                        MonitorKBps=monitor_kbps,
+                        SPMLimitKBps=spm_limit_kbps,
+                        SPMPriority=row.get('Pri', '') or "",
+                        SPMLimitUtilPct=calculate_percentage(monitor_kbps, spm_limit_kbps),
+                        SourceLoadTimeEpoch=TIME_EPOCH,
+                        SourceName="HostIOLimit",
+                        BatchCreateTimeEpoch=TIME_EPOCH,
+                    )
+                
+                for host_wwpn, wwpn_rows in rows_by_wwpn.items():
+                    # Format WWPN with colons for readability, pairing even and odd characters
+                    # (bytes.hex(':') would do this but needs Python 3.8)
+                    formatted_wwpn = ":".join(map("".join, zip(host_wwpn[::2], host_wwpn[1::2])))
                     
-                    if spm_data:
-                        # Extract required fields and add to collection
-                        for row in spm_data:
-                            # Extract values from the parsed data
-                            spm_value = row.get('KBps', '')
-                            spm_priority = row.get('Pri', '')
-                            
-                            # Find host nickname from the data
-                            host_nickname = ""
-                            nickname_match = re.search(r'10009440c9d0b045', host_output)
-                            if nickname_match:
-                                host_group = re.findall(r'host_pattern, host_nickname\.values\[0\]', host_output)
-                                if host_group:
-                                    host_nickname = host_group[0]
-                            
-                            # Format WWPN with colons for readability
-                            formatted_wwpn = ":".join([
-                                host_wwpn[i : i + 2] for i in range(0, len(host_wwpn), 2)
-                            ])
-                            
-                            # Parse SPM output to extract monitoring data
-                            spm_lines = spm_output.strip().split('\n')
-                            if len(spm_lines) > 1:  # Header + data
-                                for line in spm_lines[1:]:
-                                    parts = line.split()
-                                    if len(parts) >= 4:
-                                        spm_data_entry = {
-                                            "ArraySerial": serial_number,
-                                            "ArrayPort": port_id,
-                                            "HostNickname": host_nickname if host_nickname else "Unknown",
-                                            "HostGroup": host_group[0] if 'host_group' in locals() else "",
-                                            "HostWWPN": formatted_wwpn,
-                                            "MonitorIOps": int(parts[2]) if parts[2].isdigit() else 0,
-                                            "MonitorKBps": int(parts[3]) if parts[3].isdigit() else 0,
-                                            "SPMLimitKBps": int(spm_value) if spm_value and spm_value.isdigit() else 0,
-                                            "SPMPriority": spm_priority if spm_priority else "",
-                                            "SourceLoadTimeEpoch": TIME_EPOCH,
-                                            "SourceName": "HostIOLimit",
-                                            "BatchCreateTimeEpoch": TIME_EPOCH,
-                                        }
-                                        local_spm_data.append(spm_data_entry)
-        
-        # Thread-safe adding to global data
-        with data_lock:
-            all_spm_data.extend(local_spm_data)
+                    # One record per row of this WWPN
+                    for row in wwpn_rows:
+                        local_spm_data.append(build_entry(formatted_wwpn, row))
         
         LOG.info(f"[{thread_name}] Completed processing serial {serial_number}, collected {len(local_spm_data)} records")
+        return local_spm_data
         
     except Exception as e:
         LOG.error(f"[{thread_name}] Error processing serial number {serial_number}: {e}")
+        return []
 
-def process_serial_chunk(serial_chunk, args, TIME_EPOCH, TIME_DAYS, TIME_5MIN):
-    """Process a chunk of serial numbers in parallel"""
-    chunk_name = f"Chunk-{'-'.join(serial_chunk)}"
-    LOG.info(f"[{chunk_name}] Starting processing chunk: {serial_chunk}")
-    
-    # Create threads for each serial number in the chunk
-    threads = []
-    for serial_number in serial_chunk:
-        thread = threading.Thread(
-            target=process_serial_number,
-            args=(serial_number, args, TIME_EPOCH, TIME_DAYS, TIME_5MIN),
-            name=f"Serial-{serial_number}"
-        )
-        threads.append(thread)
-        thread.start()
-    
-    # Wait for all threads in this chunk to complete
-    for thread in threads:
-        thread.join()
-    
-    LOG.info(f"[{chunk_name}] Completed processing chunk: {serial_chunk}")
+def _to_int(value):
+    """Convert a raidcom field to int, 0 when it is empty or not a number"""
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return 0
 
 def calculate_percentage(monitor_kbps, spml_limit_kbps):
     """Calculate percentage with 2 decimal places"""
@@ -368,10 +412,6 @@ def calculate_percentage(monitor_kbps, spml_limit_kbps):
 
 def main():
     try:
-        # Reset global data
-        global all_spm_data
-        all_spm_data = []
-        
         # Parse arguments
         parser = argparse.ArgumentParser(
             description="Get data from HDS raidcom IOLIMIT SPM information"
@@ -401,15 +441,16 @@ def main():
         
         # Load configuration
         CONFIG = load_config_file("config/config.cfg")
+        args.config_dict = CONFIG
         api_name = "HITACHI"
         
         # Get credentials
-        user_salt = CONFIG.get(api_name, "user_salt")
-        password_salt = CONFIG.get(api_name, "password_salt")
-        scp_user = CONFIG.get(api_name, "scp_user")
-        scp_server = CONFIG.get(api_name, "scp_server")
+        user_salt = CONFIG[api_name]["user_salt"]
+        password_salt = CONFIG[api_name]["password_salt"]
+        scp_user = CONFIG[api_name]["scp_user"]
+        scp_server = CONFIG[api_name]["scp_server"]
         scp_name = "scp_path_" + args.region
-        scp_path = CONFIG.get(api_name, scp_name)
+        scp_path = CONFIG[api_name][scp_name]
         
         credentials = get_credentials(user_salt, password_salt, api_name)
         username = credentials[0]
@@ -428,7 +469,7 @@ def main():
         # Login to instance
         LOG.info(f"Login to raidcom with user: {args.username} and Inst: {args.inst} and Region {args.region}")
         
-        login_cmd = f"raidcom -login {args.username} {args.password} -I{args.inst}"
+        login_cmd = ["raidcom", "-login", args.username, args.password, f"-I{args.inst}"]
         run_command(login_cmd)
 
         # Get all serial numbers from raidqry -l
@@ -441,53 +482,42 @@ def main():
 
         LOG.info(f"Found {len(serial_numbers)} serial numbers: {serial_numbers}")
 
-        # Process serial numbers in chunks of 2 (or specified thread count)
-        chunk_size = 2  # Always process 2 serial numbers at a time as requested
-        serial_chunks = list(chunk_list(serial_numbers, chunk_size))
+        # Process all serial numbers on one thread pool, a free worker picks up the next serial right away
+        LOG.info(f"Processing {len(serial_numbers)} serial numbers with {args.threads} threads")
+        
+        # Records returned by each serial's worker, collected as the workers finish
+        serial_results = {}
         
-        LOG.info(f"Processing {len(serial_chunks)} chunks of {chunk_size} serial numbers each")
+        with ThreadPoolExecutor(max_workers=args.threads, thread_name_prefix="Serial") as executor:
+            futures = {
+                executor.submit(process_serial_number, serial_number, args, TIME_EPOCH, TIME_DAYS, TIME_5MIN): serial_number
+                for serial_number in serial_numbers
+            }
+            for i, future in enumerate(as_completed(futures)):
+                try:
+                    serial_results[futures[future]] = future.result()
+                except SystemExit:
+                    # A failed raidcom call exits its worker; only that serial is lost
+                    LOG.error(f"Processing of serial {futures[future]} was aborted")
+                LOG.info(f"Completed serial {futures[future]} ({i+1}/{len(serial_numbers)})")
         
-        # Process each chunk sequentially (but within each chunk, process in parallel)
-        for i, chunk in enumerate(serial_chunks):
-            LOG.info(f"Processing chunk {i+1}/{len(serial_chunks)}: {chunk}")
-            process_serial_chunk(chunk, args, TIME_EPOCH, TIME_DAYS, TIME_5MIN)
+        # Records keyed by (HostNickname, ArrayPort, HostWWPN) so duplicates are dropped;
+        # merged in serial order, so the first serial's record for a key wins whatever finished first
+        all_spm_data = {}
+        for serial_number in serial_numbers:
+            for item in serial_results.get(serial_number, ()):
+                all_spm_data.setdefault((item.HostNickname, item.ArrayPort, item.HostWWPN), item)
 
         # Create DataFrame equivalent and save to CSV
         if all_spm_data:
-            LOG.info(f"Total collected {len(all_spm_data)} SPM records from all serial numbers")
-            
-            # Remove duplicates based on specific columns
-            seen = set()
-            unique_data = []
-            for item in all_spm_data:
-                key = (item["HostNickname"], item["ArrayPort"], item["HostWWPN"])
-                if key not in seen:
-                    seen.add(key)
-                    unique_data.append(item)
-            
-            LOG.info(f"After deduplication: {len(unique_data)} unique records")
-            
-            # Calculate percentage utilization
-            for row in unique_data:
-                if "MonitorKBps" in row and "SPMLimitKBps" in row:
-                    row["SPMLimitUtilPct"] = calculate_percentage(
-                        row["MonitorKBps"], row["SPMLimitKBps"]
-                    )
-                else:
-                    LOG.warning("Required columns 'MonitorKBps' and 'SPMLimitKBps' are missing in some records.")
+            LOG.info(f"Total collected {len(all_spm_data)} unique SPM records from all serial numbers")
             
             # Generate filename with all processed serials
             all_serials_str = "_".join(serial_numbers)
             csv_filename = f"hds_iolimit_report_{args.region}_{all_serials_str}_{TIME_DAYS}.csv"
             
-            # Write CSV file
-            fieldnames = [
-                "HostNickname", "ArrayPort", "HostGroup", "HostWWPN", "ArraySerial",
-                "MonitorIOps", "MonitorKBps", "SPMLimitKBps", "SPMPriority", 
-                "SPMLimitUtilPct", "SourceLoadTimeEpoch", "SourceName", "BatchCreateTimeEpoch"
-            ]
-            
-            write_csv_file(csv_filename, unique_data, fieldnames)
+            # Write CSV file, streaming the collected records (utilization is set when each record is built)
+            write_csv_file(csv_filename, all_spm_data.values(), SPM_FIELDNAMES)
             
             # Create metadata file
             meta_filename = f"{csv_filename.replace('.csv', '')}_meta.json"
@@ -3,22 +3,27 @@
 """
 Raidcom IOLimit data collection script - Version 36
 Compatible with Python 3.6.8 with pandas for data processing
-Includes multithreading and immediate SCP transfer per file
+Includes concurrent collection and a single SCP transfer per run
 """
 
 import subprocess
+import asyncio
+import atexit
 import os
 import sys
 import json
-import csv
 import re
 import argparse
+import shlex
+import tempfile
 import configparser
 import base64
 import datetime
+import functools
 import logging
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import pandas as pd
 import io
 from typing import List, Dict, Tuple
@@ -27,9 +32,41 @@ from typing import List, Dict, Tuple
 LOG = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - [%(threadName)s] - %(message)s')
 
-# Global data structures with thread safety
-all_spm_data = []
-data_lock = threading.Lock()
+# Credential obfuscation key and its encoded "<key>:" prefix, built once
+DEFAULT_KEY = "default_key"
+DEFAULT_KEY_PREFIX = f"{DEFAULT_KEY}:".encode()
+
+# Default maximum number of raidcom/ssh/scp commands running at the same time
+MAX_CONCURRENT_COMMANDS = 32
+
+# OpenSSH connection sharing: main opens one master connection per run and
+# every mkdir/scp call to the same host reuses it instead of handshaking again.
+# Only the master persists; the other calls never start one, since before
+# OpenSSH 8.4 a persisting master keeps its caller's stderr open and a reader
+# waiting for EOF there would stall until ControlPersist runs out
+SSH_CONTROL_PATH = "ControlPath=/tmp/ssh-cm-%r@%h:%p"
+SSH_CONTROL_OPTIONS = ["-o", "ControlMaster=no", "-o", SSH_CONTROL_PATH]
+SSH_MASTER_OPTIONS = ["-o", "ControlMaster=yes", "-o", SSH_CONTROL_PATH, "-o", "ControlPersist=10m"]
+
+# Characters that make a CSV field need quoting
+CSV_SPECIAL_CHARS = (",", '"', "\n", "\r")
+
+# Patterns for parsing raidcom output, compiled once
+_SERIAL_RE = re.compile(rb'\b\d{5}\b')
+_PORT_RE = re.compile(r'CL\d-[A-Z]')
+
+# Columns of the HostIOLimit report, in CSV order: the ones collected per
+# row, then the ones that are constant for the whole run
+SPM_ROW_COLUMNS = (
+    "ArraySerial", "ArrayPort", "HostNickname", "HostGroup", "HostWWPN",
+    "MonitorIOps", "MonitorKBps", "SPMLimitKBps", "SPMPriority",
+)
+SPM_COLUMNS = SPM_ROW_COLUMNS + ("SourceLoadTimeEpoch", "SourceName", "BatchCreateTimeEpoch")
+
+# Report files written during this run as (path, size in bytes), appended by
+# the serial worker threads and listed by show_directory_structure
+REPORT_MANIFEST: List[Tuple[str, int]] = []
+REPORT_MANIFEST_LOCK = threading.Lock()
 
 def load_config_file(config_file):
     """Load configuration from file"""
@@ -37,50 +74,53 @@ def load_config_file(config_file):
     config.read(config_file)
     return config
 
-def get_timestamp(format_type="epoch"):
-    """Get timestamp in different formats"""
+def get_timestamp(format_type="epoch", now=None):
+    """Get timestamp in different formats (for `now`, default the current time)"""
+    if now is None:
+        now = datetime.datetime.now()
     if format_type == "epoch":
-        return str(int(datetime.datetime.now().timestamp()))
+        return str(int(now.timestamp()))
     elif format_type == "days":
-        return datetime.datetime.now().strftime("%Y-%m-%d")
+        return now.strftime("%Y-%m-%d")
     elif format_type == "5min":
-        return datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
+        return now.strftime("%Y-%m-%d %H:%M")
     elif format_type == "hours_min":
-        return datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-
-def get_file_path(array_serial):
-    """Get the file path for array serial"""
-    report_dir = "reports"
-    DIR_TIME_5MIN = get_timestamp("5min")
-    out_dir = os.path.join(report_dir, DIR_TIME_5MIN)
-    
-    if not os.path.exists(out_dir):
-        os.makedirs(out_dir, exist_ok=True)
-    
-    # Create a directory for the specific array serial
-    array_dir = os.path.join(out_dir, array_serial)
-    if not os.path.exists(array_dir):
-        os.makedirs(array_dir, exist_ok=True)
+        return now.strftime("%Y%m%d_%H%M%S")
+
+@functools.lru_cache(maxsize=None)
+def get_file_path(array_serial, report_dir):
+    """Get the file path for array serial, creating it on first use"""
+    # Create a directory for the specific array serial; report_dir itself
+    # is created once by main
+    array_dir = os.path.join(report_dir, array_serial)
+    os.makedirs(array_dir, exist_ok=True)
     
     return array_dir
 
-def simple_encrypt(text, key="default_key"):
+def key_prefix(key):
+    """Get the encoded "<key>:" prefix, prebuilt for the default key"""
+    if key == DEFAULT_KEY:
+        return DEFAULT_KEY_PREFIX
+    return f"{key}:".encode()
+
+def simple_encrypt(text, key=DEFAULT_KEY):
     """Simple base64 encoding"""
     try:
-        combined = f"{key}:{text}"
-        encoded = base64.b64encode(combined.encode()).decode()
+        encoded = base64.b64encode(key_prefix(key) + text.encode()).decode()
         return encoded
     except Exception as e:
         LOG.error(f"Error encoding: {e}")
         return text
 
-def simple_decrypt(encoded_text, key="default_key"):
+def simple_decrypt(encoded_text, key=DEFAULT_KEY):
     """Simple base64 decoding"""
     try:
-        decoded = base64.b64decode(encoded_text.encode()).decode()
-        if decoded.startswith(f"{key}:"):
-            return decoded[len(f"{key}:"):]
-        return decoded
+        # Stay in bytes until the prefix is stripped
+        decoded = base64.b64decode(encoded_text)
+        prefix = key_prefix(key)
+        if decoded.startswith(prefix):
+            return decoded[len(prefix):].decode()
+        return decoded.decode()
     except Exception as e:
         LOG.error(f"Error decoding: {e}")
         return encoded_text
@@ -92,58 +132,109 @@ def get_credentials(user_salt, password_salt, api_name):
     return username, password
 
 def run_command(command):
-    """Execute shell command and return output"""
+    """Execute command (argv list, no shell) and return its raw output bytes"""
     try:
         result = subprocess.run(
             command,
-            shell=True,
             check=True,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            universal_newlines=True,
         )
         return result.stdout
     except subprocess.CalledProcessError as e:
-        LOG.error(f"Error executing command: {command}")
-        LOG.error(f"Error message: {e.stderr}")
+        LOG.error(f"Error executing command: {' '.join(command)}")
+        LOG.error(f"Error message: {e.stderr.decode(errors='replace')}")
         return None
 
-def send_scp_file(user, file_path, remote_server, remote_path, scp_key):
-    """Send file to remote server using SCP - Thread-safe version"""
-    try:
-        # Thread-safe remote directory creation
-        remote_mkdir_command = f"ssh -i {scp_key} {user}@{remote_server} mkdir -p {remote_path}"
-        LOG.info(f"[{threading.current_thread().name}] Creating remote directory: {remote_path}")
-        
-        result = subprocess.run(
-            remote_mkdir_command,
-            shell=True,
-            check=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            universal_newlines=True,
+async def run_command_async(command, semaphore):
+    """Execute command (argv list, no shell) without blocking other commands, returning raw output bytes"""
+    async with semaphore:
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
         )
-
-        # SCP command
-        scp_command = f"scp -i {scp_key} {file_path} {user}@{remote_server}:{remote_path}"
-        LOG.info(f"[{threading.current_thread().name}] Sending file: {file_path} to {remote_server}:{remote_path}")
-        
+        stdout, stderr = await process.communicate()
+    
+    if process.returncode != 0:
+        LOG.error(f"Error executing command: {' '.join(command)}")
+        LOG.error(f"Error message: {stderr.decode(errors='replace')}")
+        return None
+    return stdout
+
+async def stream_command_async(command, semaphore):
+    """Execute command (argv list, no shell) and yield its output lines as they arrive"""
+    async with semaphore:
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        async for line in process.stdout:
+            yield line.decode().rstrip("\n")
+        stderr = await process.stderr.read()
+        await process.wait()
+    
+    if process.returncode != 0:
+        LOG.error(f"Error executing command: {' '.join(command)}")
+        LOG.error(f"Error message: {stderr.decode()}")
+
+def open_ssh_master(user, remote_server, scp_key):
+    """Open the shared SSH connection for the run and close it again at exit"""
+    remote_target = f"{user}@{remote_server}"
+    # The master stays in the background (ControlPersist) after `true` exits and
+    # inherits stderr, so that goes to a file rather than a pipe nobody would close
+    with tempfile.TemporaryFile() as stderr_file:
         result = subprocess.run(
-            scp_command,
-            shell=True,
-            check=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            universal_newlines=True,
+            ["ssh", "-i", scp_key, *SSH_MASTER_OPTIONS, remote_target, "true"],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=stderr_file,
         )
-        
-        LOG.info(f"[{threading.current_thread().name}] ✅ File {file_path} sent successfully")
-        return True
-        
-    except subprocess.CalledProcessError as e:
-        LOG.error(f"[{threading.current_thread().name}] ❌ Error sending file {file_path}: {e.stderr}")
+        if result.returncode != 0:
+            stderr_file.seek(0)
+            LOG.warning(f"Could not open shared SSH connection to {remote_server}: {stderr_file.read().decode(errors='replace')}")
+            return False
+    
+    atexit.register(close_ssh_master, user, remote_server)
+    return True
+
+def close_ssh_master(user, remote_server):
+    """Close the shared SSH connection"""
+    subprocess.run(
+        ["ssh", *SSH_CONTROL_OPTIONS, "-O", "exit", f"{user}@{remote_server}"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+
+async def send_scp_files(user, file_paths, remote_server, remote_path, scp_key, semaphore):
+    """Send files or directories to remote server using a single SCP session, without blocking the event loop"""
+    remote_target = f"{user}@{remote_server}"
+    file_list = ", ".join(file_paths)
+    
+    # Remote directory creation; ssh hands its arguments to the remote
+    # shell, so the path is quoted
+    remote_mkdir_command = [
+        "ssh", "-i", scp_key, *SSH_CONTROL_OPTIONS, remote_target, "mkdir", "-p", shlex.quote(remote_path)
+    ]
+    LOG.debug("Creating remote directory: %s", remote_path)
+    
+    if await run_command_async(remote_mkdir_command, semaphore) is None:
+        LOG.error(f"❌ Error sending files {file_list}: cannot create {remote_path}")
         return False
 
+    # SCP command, all files go over one connection (directories recursively);
+    # scp exits non-zero if any file fails, so no remote listing is needed
+    scp_command = ["scp", "-r", "-i", scp_key, *SSH_CONTROL_OPTIONS, *file_paths, f"{remote_target}:{remote_path}"]
+    LOG.info("Sending files: %s to %s:%s", file_list, remote_server, remote_path)
+    
+    if await run_command_async(scp_command, semaphore) is None:
+        LOG.error(f"❌ Error sending files {file_list}")
+        return False
+    
+    LOG.info("✅ Files %s sent successfully", file_list)
+    return True
+
 def save_meta_json(filename, batch_epoch, column, region):
     """Save metadata to JSON file"""
     data = {
@@ -161,48 +252,67 @@ def save_meta_json(filename, batch_epoch, column, region):
     
     with open(filename, "w") as f:
         json.dump(data, f, indent=4)
+        add_to_manifest(filename, f)
 
-def parse_raidcom_output_with_pandas(content: str, separator: str = " ") -> pd.DataFrame:
+def add_to_manifest(path, file_obj):
+    """Record a written report file, sizing it from its still open handle"""
+    file_obj.flush()
+    size = os.fstat(file_obj.fileno()).st_size
+    with REPORT_MANIFEST_LOCK:
+        REPORT_MANIFEST.append((path, size))
+
+def parse_raidcom_output_with_pandas(content: bytes) -> pd.DataFrame:
     """Parse raidcom output using pandas"""
-    if not content or not content.strip():
+    # Nothing or only the header line: no rows, no need to start the parser
+    content = content.strip() if content else b""
+    if b"\n" not in content:
         return pd.DataFrame()
     
-    # Use io.StringIO to create file-like object from string
-    string_buffer = io.StringIO(content)
+    # Hand pandas the raw bytes; its C parser decodes while tokenizing,
+    # so the output is never decoded into a Python string first
+    string_buffer = io.BytesIO(content)
     
     try:
-        # Read with pandas, handling various separators
-        df = pd.read_csv(string_buffer, sep=r'\s+', engine='python')
+        # Whitespace-separated columns go through pandas' C tokenizer; keep
+        # every field as text so WWPNs and IDs are not coerced to numbers
+        df = pd.read_csv(string_buffer, sep=r'\s+', engine='c', dtype=str)
         return df
     except Exception as e:
         LOG.error(f"Error parsing with pandas: {e}")
         return pd.DataFrame()
 
+def text_column(df: pd.DataFrame, column: str, default: str) -> np.ndarray:
+    """Get a parsed column as an array, with missing values as default"""
+    if column not in df.columns:
+        return np.full(len(df), default, dtype=object)
+    return df[column].fillna(default).to_numpy()
+
+def numeric_column(df: pd.DataFrame, column: str) -> np.ndarray:
+    """Convert a parsed column to an int64 array, with missing or non-numeric values as 0"""
+    if column not in df.columns:
+        return np.zeros(len(df), dtype='int64')
+    return pd.to_numeric(df[column], errors='coerce').fillna(0).astype('int64').to_numpy()
+
 def get_serial_numbers(instance):
     """Get all serial numbers from raidqry -l command"""
     try:
-        cmd = f"raidqry -l -I{instance}"
-        LOG.info(f"Getting serial numbers with command: {cmd}")
+        cmd = ["raidqry", "-l", f"-I{instance}"]
+        LOG.info(f"Getting serial numbers with command: {' '.join(cmd)}")
         
         output = run_command(cmd)
         if not output:
             return []
         
-        # Extract serial numbers (5-digit numbers)
-        serial_numbers = re.findall(r'\b\d{5}\b', output)
+        # Extract serial numbers (5-digit numbers), removing duplicates while
+        # preserving order as the matches are found
+        unique_serials = list(dict.fromkeys(
+            match.group(0).decode() for match in _SERIAL_RE.finditer(output)
+        ))
         
-        if not serial_numbers:
+        if not unique_serials:
             LOG.warning("No serial numbers found from raidqry command")
             return []
         
-        # Remove duplicates while preserving order
-        unique_serials = []
-        seen = set()
-        for serial in serial_numbers:
-            if serial not in seen:
-                seen.add(serial)
-                unique_serials.append(serial)
-        
         LOG.info(f"Found {len(unique_serials)} unique serial numbers: {unique_serials}")
         return unique_serials
         
@@ -210,223 +320,239 @@ def get_serial_numbers(instance):
         LOG.error(f"Error getting serial numbers: {e}")
         return []
 
-def chunk_list(lst, chunk_size):
-    """Divide list into chunks of specified size"""
-    for i in range(0, len(lst), chunk_size):
-        yield lst[i:i + chunk_size]
-
-def calculate_percentage(monitor_kbps, spml_limit_kbps):
-    """Calculate percentage with 2 decimal places"""
-    try:
-        if monitor_kbps and spml_limit_kbps and float(spml_limit_kbps) > 0:
-            return round((float(monitor_kbps) / float(spml_limit_kbps)) * 100, 2)
-        else:
-            return 0
-    except (ValueError, ZeroDivisionError):
-        return 0
-
-def process_and_save_serial_data(serial_number: str, data_list: List[Dict], 
-                               TIME_EPOCH: str, region: str, scp_config: Dict):
-    """Process data for a single serial and save to CSV/JSON with immediate SCP transfer"""
-    if not data_list:
+def write_csv_fast(csv_file, df: pd.DataFrame) -> bool:
+    """Write a DataFrame as CSV by joining its columns as text
+
+    Returns False without writing anything when a text field would need
+    CSV quoting, so the caller can fall back to DataFrame.to_csv.
+    """
+    columns = [df[column].to_numpy().astype(str) for column in df.columns]
+    for values, dtype in zip(columns, df.dtypes):
+        if dtype.kind in "iuf":
+            continue
+        if any((np.char.find(values, char) >= 0).any() for char in CSV_SPECIAL_CHARS):
+            return False
+    
+    csv_file.write(",".join(df.columns) + "\n")
+    csv_file.writelines(",".join(row) + "\n" for row in zip(*columns))
+    return True
+
+def process_and_save_serial_data(serial_number: str, df: pd.DataFrame, 
+                               TIME_EPOCH: str, report_dir: str, region: str,
+                               safe_csv: bool = False) -> List[str]:
+    """Process data for a single serial and save to CSV/JSON, returning the saved file paths"""
+    if df.empty:
         LOG.warning(f"No data to save for serial {serial_number}")
-        return
+        return []
     
     try:
-        # Convert to pandas DataFrame
-        df = pd.DataFrame(data_list)
-        
-        # Add calculated percentage column
+        # Add calculated percentage column for all rows at once (0 without a limit)
         if 'MonitorKBps' in df.columns and 'SPMLimitKBps' in df.columns:
-            df['PercentageUsed'] = df.apply(
-                lambda row: calculate_percentage(row['MonitorKBps'], row['SPMLimitKBps']), 
-                axis=1
-            )
+            monitor_kbps = df['MonitorKBps'].to_numpy(dtype=float)
+            spm_limit_kbps = df['SPMLimitKBps'].to_numpy(dtype=float)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                df['PercentageUsed'] = np.where(
+                    spm_limit_kbps > 0, np.round(monitor_kbps / spm_limit_kbps * 100, 2), 0.0
+                )
         
         # Sort by ArrayPort and HostNickname
         if 'ArrayPort' in df.columns and 'HostNickname' in df.columns:
             df = df.sort_values(['ArrayPort', 'HostNickname'])
         
         # Get file paths
-        array_dir = get_file_path(serial_number)
+        array_dir = get_file_path(serial_number, report_dir)
         csv_filename = f"HostIOLimit_{serial_number}_{TIME_EPOCH}.csv"
         json_filename = f"HostIOLimit_{serial_number}_{TIME_EPOCH}.json"
         
         csv_path = os.path.join(array_dir, csv_filename)
         json_path = os.path.join(array_dir, json_filename)
         
-        # Save CSV using pandas
-        df.to_csv(csv_path, index=False)
-        LOG.info(f"[{threading.current_thread().name}] 💾 Saved CSV: {csv_path}")
+        # Save CSV through a 1 MiB buffer, so the file goes out in a few large
+        # writes; plain joined columns unless a field needs quoting (or
+        # --safe-csv asks for pandas)
+        with open(csv_path, "w", buffering=1 << 20, newline="") as csv_file:
+            if safe_csv or not write_csv_fast(csv_file, df):
+                df.to_csv(csv_file, index=False)
+            add_to_manifest(csv_path, csv_file)
+        LOG.info("[%s] 💾 Saved CSV: %s", threading.current_thread().name, csv_path)
         
         # Save metadata JSON
         save_meta_json(json_path, TIME_EPOCH, "HostIOLimit", region)
-        LOG.info(f"[{threading.current_thread().name}] 💾 Saved JSON: {json_path}")
-        
-        # Send files via SCP immediately
-        if scp_config:
-            remote_array_dir = os.path.join(scp_config['scp_path'], get_timestamp("5min"), serial_number)
-            
-            # Send CSV
-            send_scp_file(
-                scp_config['scp_user'], 
-                csv_path, 
-                scp_config['scp_server'], 
-                remote_array_dir, 
-                scp_config['scp_key']
-            )
-            
-            # Send JSON
-            send_scp_file(
-                scp_config['scp_user'], 
-                json_path, 
-                scp_config['scp_server'], 
-                remote_array_dir, 
-                scp_config['scp_key']
-            )
+        LOG.info("[%s] 💾 Saved JSON: %s", threading.current_thread().name, json_path)
+        
+        return [csv_path, json_path]
         
     except Exception as e:
         LOG.error(f"[{threading.current_thread().name}] Error saving data for serial {serial_number}: {e}")
+        return []
 
-def process_serial_number(serial_number: str, args, TIME_EPOCH: str, TIME_DAYS: str, 
-                         TIME_5MIN: str, scp_config: Dict):
-    """Process a single serial number to collect SPM data"""
-    thread_name = threading.current_thread().name
-    LOG.info(f"[{thread_name}] 🔄 Processing serial number: {serial_number}")
+async def collect_port_spm_data(serial_number: str, port_id: str, args, semaphore) -> pd.DataFrame:
+    """Collect SPM data for a single port, or None when the port has none"""
+    log_name = f"Serial-{serial_number}"
+    LOG.debug("[%s] Checking port %s...", log_name, port_id)
+    
+    # Get SPM WWN information; the listing already carries the host group
+    # and nickname of every WWPN, so one call per port is enough
+    spm_cmd = ["raidcom", "get", "spm_wwn", "-port", port_id, "-s", serial_number, f"-IH{{{args.inst}}}"]
+    spm_output = await run_command_async(spm_cmd, semaphore)
+    
+    if not spm_output:
+        return None
+    
+    # Parse SPM data with pandas
+    spm_df = parse_raidcom_output_with_pandas(spm_output)
+    
+    if spm_df.empty:
+        return None
+    
+    # Build the port's rows straight from the parsed columns, so the output is
+    # tokenized once; WWPNs are reported as raidcom prints them
+    return pd.DataFrame({
+        "ArraySerial": serial_number,
+        "ArrayPort": port_id,
+        "HostNickname": text_column(spm_df, 'NICK_NAME', 'Unknown'),
+        "HostGroup": text_column(spm_df, 'GROUP', ''),
+        "HostWWPN": text_column(spm_df, 'HBA_WWN', ''),
+        "MonitorIOps": numeric_column(spm_df, 'IOPS'),
+        "MonitorKBps": numeric_column(spm_df, 'KBPS'),
+        "SPMLimitKBps": numeric_column(spm_df, 'SPM_LIMIT'),
+        "SPMPriority": text_column(spm_df, 'PRIORITY', ''),
+    }, columns=SPM_ROW_COLUMNS)
+
+async def process_serial_number(serial_number: str, args, TIME_EPOCH: str, TIME_DAYS: str, 
+                                report_dir: str, semaphore) -> pd.DataFrame:
+    """Process a single serial number to collect SPM data, returning the serial's rows"""
+    log_name = f"Serial-{serial_number}"
+    LOG.info("[%s] 🔄 Processing serial number: %s", log_name, serial_number)
     
     try:
-        local_spm_data = []
+        port_frames = []
         
         # Get port information for this serial number
-        port_cmd = f"raidcom get port -s {serial_number} -IH{{{args.inst}}}"
-        LOG.info(f"[{thread_name}] Getting ports for serial {serial_number}")
-        
-        port_output = run_command(port_cmd)
-        if not port_output:
-            LOG.warning(f"[{thread_name}] No port data for serial {serial_number}")
-            return
+        port_cmd = ["raidcom", "get", "port", "-s", serial_number, f"-IH{{{args.inst}}}"]
+        LOG.debug("[%s] Getting ports for serial %s", log_name, serial_number)
         
-        # Parse port output with pandas
-        port_df = parse_raidcom_output_with_pandas(port_output)
-        
-        # Extract port IDs
+        # Extract port IDs from the PORT column while the output streams in,
+        # without holding the whole listing in memory
         port_ids = []
-        if not port_df.empty and 'PORT' in port_df.columns:
-            port_ids = port_df['PORT'].tolist()
-        else:
-            # Fallback to regex
-            port_ids = re.findall(r'CL\d-[A-Z]', port_output)
-        
-        LOG.info(f"[{thread_name}] Found {len(port_ids)} ports for serial {serial_number}")
-        
-        # Process each port
-        for port_id in port_ids:
-            LOG.info(f"[{thread_name}] Checking port {port_id}...")
-            
-            # Get host group information
-            hg_cmd = f"raidcom get host_grp -port {port_id} -s {serial_number} -IH{{{args.inst}}}"
-            hg_output = run_command(hg_cmd)
-            
-            if not hg_output:
-                continue
-            
-            # Parse host groups with pandas
-            hg_df = parse_raidcom_output_with_pandas(hg_output)
-            
-            if hg_df.empty:
+        port_column = None
+        async for line in stream_command_async(port_cmd, semaphore):
+            fields = line.split()
+            if not fields:
                 continue
-            
-            # Get SPM WWN information
-            spm_cmd = f"raidcom get spm_wwn -port {port_id} -s {serial_number} -IH{{{args.inst}}}"
-            spm_output = run_command(spm_cmd)
-            
-            if not spm_output:
+            if port_column is None and 'PORT' in fields:
+                port_column = fields.index('PORT')
+            elif port_column is not None:
+                if len(fields) > port_column:
+                    port_ids.append(fields[port_column])
+            else:
+                # Fallback to regex
+                port_ids.extend(_PORT_RE.findall(line))
+        
+        if not port_ids:
+            LOG.warning(f"[{log_name}] No port data for serial {serial_number}")
+            return pd.DataFrame(columns=SPM_COLUMNS)
+        
+        LOG.info("[%s] Found %d ports for serial %s", log_name, len(port_ids), serial_number)
+        
+        # Query all ports at once; the semaphore bounds the raidcom processes in flight
+        port_results = await asyncio.gather(*(
+            collect_port_spm_data(serial_number, port_id, args, semaphore)
+            for port_id in port_ids
+        ), return_exceptions=True)
+        
+        for port_id, port_result in zip(port_ids, port_results):
+            if isinstance(port_result, Exception):
+                LOG.error(f"[{log_name}] Error processing port {port_id}: {port_result}")
                 continue
-            
-            # Parse SPM data with pandas
-            spm_df = parse_raidcom_output_with_pandas(spm_output)
-            
-            if not spm_df.empty:
-                # Process SPM data
-                for idx, row in spm_df.iterrows():
-                    try:
-                        spm_entry = {
-                            "ArraySerial": serial_number,
-                            "ArrayPort": port_id,
-                            "HostNickname": row.get('NICK_NAME', 'Unknown'),
-                            "HostGroup": str(row.get('GROUP', '')),
-                            "HostWWPN": row.get('HBA_WWN', ''),
-                            "MonitorIOps": int(row.get('IOPS', 0)),
-                            "MonitorKBps": int(row.get('KBPS', 0)),
-                            "SPMLimitKBps": int(row.get('SPM_LIMIT', 0)),
-                            "SPMPriority": str(row.get('PRIORITY', '')),
-                            "SourceLoadTimeEpoch": TIME_EPOCH,
-                            "SourceName": "HostIOLimit",
-                            "BatchCreateTimeEpoch": TIME_EPOCH,
-                        }
-                        local_spm_data.append(spm_entry)
-                    except Exception as e:
-                        LOG.error(f"[{thread_name}] Error processing row: {e}")
-        
-        # Save data for this serial number immediately
-        if local_spm_data:
-            process_and_save_serial_data(
+            if port_result is not None:
+                port_frames.append(port_result)
+        
+        # Save data for this serial number immediately; file writing runs
+        # off the event loop
+        if port_frames:
+            # Join the ports into the serial's DataFrame in one call, then
+            # broadcast the run-wide values as whole columns
+            spm_df = pd.concat(port_frames, ignore_index=True)
+            spm_df["SourceLoadTimeEpoch"] = TIME_EPOCH
+            spm_df["SourceName"] = "HostIOLimit"
+            spm_df["BatchCreateTimeEpoch"] = TIME_EPOCH
+            loop = asyncio.get_event_loop()
+            await loop.run_in_executor(
+                None,
+                process_and_save_serial_data,
                 serial_number, 
-                local_spm_data, 
+                spm_df, 
                 TIME_EPOCH, 
-                args.region, 
-                scp_config
+                report_dir, 
+                args.region,
+                args.safe_csv
             )
-            LOG.info(f"[{thread_name}] ✅ Completed serial {serial_number}: {len(local_spm_data)} records")
-        else:
-            LOG.warning(f"[{thread_name}] ⚠️ No data collected for serial {serial_number}")
+
+            LOG.info("[%s] ✅ Completed serial %s: %d records", log_name, serial_number, len(spm_df))
+            return spm_df
+        
+        LOG.warning(f"[{log_name}] ⚠️ No data collected for serial {serial_number}")
         
     except Exception as e:
-        LOG.error(f"[{thread_name}] ❌ Error processing serial {serial_number}: {e}")
-
-def process_serial_chunk(serial_chunk: List[str], args, TIME_EPOCH: str, 
-                        TIME_DAYS: str, TIME_5MIN: str, scp_config: Dict):
-    """Process a chunk of serial numbers in parallel with 2 threads"""
-    chunk_name = f"Chunk-{'-'.join(serial_chunk)}"
-    LOG.info(f"[{chunk_name}] 📦 Starting chunk with {len(serial_chunk)} serials")
+        LOG.error(f"[{log_name}] ❌ Error processing serial {serial_number}: {e}")
     
-    # Create threads for each serial number in the chunk
-    threads = []
-    for serial_number in serial_chunk:
-        thread = threading.Thread(
-            target=process_serial_number,
-            args=(serial_number, args, TIME_EPOCH, TIME_DAYS, TIME_5MIN, scp_config),
-            name=f"Serial-{serial_number}"
-        )
-        threads.append(thread)
-        thread.start()
-    
-    # Wait for all threads in this chunk to complete
-    for thread in threads:
-        thread.join()
-    
-    LOG.info(f"[{chunk_name}] ✅ Completed chunk processing")
+    return pd.DataFrame(columns=SPM_COLUMNS)
+
+def process_all_serials(serial_numbers: List[str], args, TIME_EPOCH: str, 
+                        TIME_DAYS: str, report_dir: str, scp_config: Dict) -> List[pd.DataFrame]:
+    """Process all serial numbers concurrently on one event loop, returning each serial's rows"""
+    # Run every serial on one event loop in the main thread, so a slow array
+    # never holds back the others; only writing each serial's files runs
+    # on a pool of worker threads
+    # (explicit loop instead of asyncio.run, which Python 3.6 doesn't have)
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    executor = ThreadPoolExecutor(max_workers=args.threads, thread_name_prefix="Serial")
+    loop.set_default_executor(executor)
+    try:
+        semaphore = asyncio.Semaphore(args.max_commands)
+        serial_frames = loop.run_until_complete(asyncio.gather(*(
+            process_serial_number(serial_number, args, TIME_EPOCH, TIME_DAYS, report_dir, semaphore)
+            for serial_number in serial_numbers
+        )))
+        
+        # Push the whole run directory in one transfer once every serial is
+        # saved; scp -r recreates reports/<5min>/<serial>/ under scp_path
+        if scp_config and any(not frame.empty for frame in serial_frames):
+            loop.run_until_complete(send_scp_files(
+                scp_config['scp_user'],
+                [report_dir],
+                scp_config['scp_server'],
+                scp_config['scp_path'],
+                scp_config['scp_key'],
+                semaphore
+            ))
+        
+        return serial_frames
+    finally:
+        executor.shutdown(wait=True)
+        loop.close()
 
 def show_directory_structure():
-    """Show the generated directory structure"""
-    if os.path.exists("reports"):
+    """Show the report files written by this run, grouped by directory"""
+    if REPORT_MANIFEST and LOG.isEnabledFor(logging.INFO):
         LOG.info("📂 Generated directory structure:")
-        for root, dirs, files in os.walk("reports"):
-            level = root.replace("reports", "").count(os.sep)
-            indent = "  " * level
-            LOG.info(f"{indent}📁 {os.path.basename(root)}/")
-            subindent = "  " * (level + 1)
-            for file in files:
-                file_size = os.path.getsize(os.path.join(root, file))
-                LOG.info(f"{subindent}📄 {file} ({file_size} bytes)")
+        current_dir = None
+        for path, size in sorted(REPORT_MANIFEST):
+            directory, name = os.path.split(path)
+            if directory != current_dir:
+                LOG.info(f"📁 {directory}/")
+                current_dir = directory
+            LOG.info(f"  📄 {name} ({size} bytes)")
 
 def main():
     try:
-        LOG.info("🚀 Starting Raidcom IOLimit Script v36 - Python 3.6 + Pandas + Immediate SCP")
+        LOG.info("🚀 Starting Raidcom IOLimit Script v36 - Python 3.6 + Pandas + Single SCP push")
         
         # Parse arguments
         parser = argparse.ArgumentParser(
-            description="Raidcom IOLimit data collection with pandas and immediate SCP transfer"
+            description="Raidcom IOLimit data collection with pandas and a single SCP transfer"
         )
         parser.add_argument(
             "--inst", type=int, required=True, help="Raidcom instance (e.g., 99)"
@@ -444,6 +570,18 @@ def main():
         parser.add_argument(
             "--password", type=str, required=False, help="Password for raidcom AD user"
         )
+        parser.add_argument(
+            "--threads", type=int, default=None,
+            help="Worker threads for saving report files (default: min(32, number of serials))"
+        )
+        parser.add_argument(
+            "--max-commands", type=int, default=MAX_CONCURRENT_COMMANDS,
+            help=f"Maximum raidcom/ssh/scp commands running at once (default: {MAX_CONCURRENT_COMMANDS})"
+        )
+        parser.add_argument(
+            "--safe-csv", action="store_true",
+            help="Always write report CSVs with pandas instead of the fast writer"
+        )
 
         args = parser.parse_args()
         region = args.region
@@ -473,6 +611,10 @@ def main():
         
         LOG.info(f"🔧 SCP Configuration: {scp_config['scp_server']}:{scp_config['scp_path']}")
         
+        # One SSH handshake for the whole run; serials transferring at the same
+        # time would otherwise race to open their own master connections
+        open_ssh_master(scp_user, scp_server, scp_key)
+        
         # Get credentials
         credentials = get_credentials(user_salt, password_salt, api_name)
         username = credentials[0]
@@ -483,16 +625,19 @@ def main():
         if not args.password:
             args.password = password
 
-        # Get all timestamps
-        TIME_EPOCH = get_timestamp("epoch")
-        TIME_DAYS = get_timestamp("days")
-        TIME_5MIN = get_timestamp("5min")
+        # Get all timestamps from one moment, so every serial of the run
+        # lands in the same directory even across a minute boundary
+        RUN_NOW = datetime.datetime.now()
+        TIME_EPOCH = get_timestamp("epoch", RUN_NOW)
+        TIME_DAYS = get_timestamp("days", RUN_NOW)
+        TIME_5MIN = get_timestamp("5min", RUN_NOW)
         
         LOG.info(f"⏰ Timestamp: {TIME_5MIN} (Epoch: {TIME_EPOCH})")
+        REPORT_DIR = os.path.join("reports", TIME_5MIN)
 
         # Login to raidcom
         LOG.info(f"🔐 Login to raidcom with user: {args.username}")
-        login_cmd = f"raidcom -login {args.username} {args.password} -I{args.inst}"
+        login_cmd = ["raidcom", "-login", args.username, args.password, f"-I{args.inst}"]
         
         login_result = run_command(login_cmd)
         if login_result is None:
@@ -506,28 +651,22 @@ def main():
         if not serial_numbers:
             LOG.error("❌ No serial numbers found")
             # Logout before exit
-            run_command(f"raidcom -logout -I{args.inst}")
+            run_command(["raidcom", "-logout", f"-I{args.inst}"])
             sys.exit(1)
 
         LOG.info(f"📋 Found {len(serial_numbers)} serial numbers: {serial_numbers}")
 
-        # Process in chunks of 2 with parallel threads
-        chunk_size = 2
-        serial_chunks = list(chunk_list(serial_numbers, chunk_size))
+        # Process all serials at once
+        if not args.threads:
+            args.threads = min(32, len(serial_numbers))
+        
+        LOG.info(f"🧵 Processing {len(serial_numbers)} serials with {args.threads} worker threads")
         
-        LOG.info(f"📦 Processing {len(serial_chunks)} chunks ({chunk_size} serials per chunk)")
-        LOG.info(f"🧵 Each chunk runs {chunk_size} threads in parallel")
+        # Directory for this run's reports, created once for all serials
+        os.makedirs(REPORT_DIR, exist_ok=True)
         
-        # Process each chunk
-        for i, chunk in enumerate(serial_chunks):
-            LOG.info(f"")
-            LOG.info(f"{'='*60}")
-            LOG.info(f"🔄 Processing chunk {i+1}/{len(serial_chunks)}: {chunk}")
-            LOG.info(f"{'='*60}")
-            
-            process_serial_chunk(chunk, args, TIME_EPOCH, TIME_DAYS, TIME_5MIN, scp_config)
-            
-            LOG.info(f"✅ Completed chunk {i+1}/{len(serial_chunks)}")
+        serial_frames = process_all_serials(serial_numbers, args, TIME_EPOCH, TIME_DAYS, REPORT_DIR, scp_config)
+        total_records = sum(len(frame) for frame in serial_frames)
 
         LOG.info(f"")
         LOG.info(f"{'='*60}")
@@ -540,13 +679,14 @@ def main():
         LOG.info(f"")
         LOG.info(f"📊 Summary:")
         LOG.info(f"   - Processed: {len(serial_numbers)} serial numbers")
-        LOG.info(f"   - Chunks: {len(serial_chunks)}")
-        LOG.info(f"   - Files location: reports/{TIME_5MIN}/")
+        LOG.info(f"   - Records: {total_records}")
+        LOG.info(f"   - Threads: {args.threads}")
+        LOG.info(f"   - Files location: {REPORT_DIR}/")
         LOG.info(f"   - Remote location: {scp_config['scp_server']}:{scp_config['scp_path']}")
 
         # Logout from raidcom
         LOG.info(f"🔓 Logout from instance {args.inst}")
-        logout_cmd = f"raidcom -logout -I{args.inst}"
+        logout_cmd = ["raidcom", "-logout", f"-I{args.inst}"]
         run_command(logout_cmd)
         
         LOG.info("✅ Script completed successfully!")
@@ -555,7 +695,7 @@ def main():
         LOG.critical(f"💥 Critical error: {e}", exc_info=True)
         # Try to logout even on error
         try:
-            run_command(f"raidcom -logout -I{args.inst}")
+            run_command(["raidcom", "-logout", f"-I{args.inst}"])
         except:
             pass
         sys.exit(1)
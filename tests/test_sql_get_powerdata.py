@@ -0,0 +1,64 @@
+import importlib.util
+import logging
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+
+SCRIPT = Path(__file__).resolve().parent.parent / "2_sql_get_powerdata.py"
+
+
+def load_script():
+    """Import 2_sql_get_powerdata.py, whose file name is not a valid module name"""
+    spec = importlib.util.spec_from_file_location("sql_get_powerdata", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    # The script only creates its logger when run as __main__
+    module.logger = logging.getLogger("sql_get_powerdata")
+    return module
+
+
+try:
+    powerdata = load_script()
+except ImportError as e:
+    powerdata = None
+    SKIP_REASON = f"2_sql_get_powerdata.py dependencies missing: {e}"
+else:
+    SKIP_REASON = ""
+
+
+@unittest.skipIf(powerdata is None, SKIP_REASON)
+class ProcessCsvFileTest(unittest.TestCase):
+    def setUp(self):
+        self.config = powerdata.configparser.ConfigParser()
+        self.config.read_dict({
+            "processing": {"max_workers": "1", "worker_pool": "thread"},
+            "queries": {"ov_batch_query": "ov", "ome_batch_query": "ome"},
+        })
+
+    def fake_batch(self, serial_numbers, config):
+        return pd.DataFrame({
+            "SerialNumber": serial_numbers,
+            "OV_AveragePower": [100 + i for i in range(len(serial_numbers))],
+            "OME_AvgPower": [200 + i for i in range(len(serial_numbers))],
+        })
+
+    def test_second_run_over_same_csv_replaces_results(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = Path(tmp) / "servers.csv"
+            pd.DataFrame({"serialNumber": ["ABC1", "ABC2"], "site": ["x", "y"]}).to_csv(csv_path, index=False)
+
+            with mock.patch.object(powerdata, "process_serial_numbers_batch", self.fake_batch):
+                self.assertTrue(powerdata.process_csv_file(str(csv_path), self.config))
+                first = pd.read_csv(csv_path)
+                self.assertTrue(powerdata.process_csv_file(str(csv_path), self.config))
+                second = pd.read_csv(csv_path)
+
+            self.assertEqual(list(second.columns), ["serialNumber", "site", "OV_AveragePower", "OME_AvgPower"])
+            pd.testing.assert_frame_equal(first, second)
+
+
+if __name__ == "__main__":
+    unittest.main()